@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : build.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import os
+import glob
+import time
+import fcntl
+import shutil
+import random
+import hashlib
+import logging
+import subprocess
+import xml.etree.ElementTree as ET
+import cocotb
+from common.constants import cfg_const
+from cocotb_test.simulator import run, Verilator
+
+RUN_DIR     = cfg_const.RUN_DIR
+BUILD_STAMP = "build.stamp"
+# Incremental build knobs, when the RTL changes the generated C++ is split
+# per module so ccache only misses on the translation units that changed
+BUILD_JOBS   = int(os.getenv("DMA_BUILD_JOBS", os.cpu_count() or 1))
+BUILD_CCACHE = os.getenv("DMA_BUILD_CCACHE", "1") == "1"
+BUILD_ARGS   = ["--output-split","20000","--output-split-cfuncs","20000"]
+
+class cached_verilator(Verilator):
+    """
+    Verilator runner that only executes an already built model, the
+    compile/make steps are skipped as the binary comes from the cache.
+    With a trace_file the model dumps waves (needs a traced build).
+    """
+    def __init__(self, trace_file=None, **kwargs):
+        super().__init__(**kwargs)
+        self.trace_file = trace_file
+
+    def build_command(self):
+        out_file = os.path.join(self.sim_dir, self.toplevel_module)
+        trace = ["--trace","--trace-file",self.trace_file] if self.trace_file else []
+        return [[out_file] + trace + self.plus_args]
+
+    def failed_tests(self):
+        # Names of the failing tests of the last run() from the results file
+        results = self.env.get("COCOTB_RESULTS_FILE")
+        if results is None or not os.path.isfile(results):
+            return []
+        return [tc.get("name") for tc in ET.parse(results).iter("testcase") if tc.find("failure") is not None]
+
+def _hash_file(sha, path):
+    sha.update(path.encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+
+def _tool_version():
+    try:
+        out = subprocess.run(["verilator","--version"], capture_output=True, text=True)
+        return out.stdout.strip()
+    except OSError:
+        return "unknown"
+
+def get_build_hash(flavor):
+    # Everything that changes the generated model must be part of the key,
+    # the python side of the tests is loaded at runtime so it is not included
+    sha = hashlib.sha256()
+    for src in cfg_const._get_sources(flavor):
+        _hash_file(sha, os.path.abspath(src))
+    for inc in cfg_const.INC_DIR:
+        for hdr in sorted(glob.glob(f'{inc}/*.svh')+glob.glob(f'{inc}/*.vh')):
+            _hash_file(sha, os.path.abspath(hdr))
+    _hash_file(sha, os.path.join(cfg_const.PATH_RUN,"verilator.flags"))
+    _hash_file(sha, os.path.join(cfg_const.PATH_RUN,"verilator_config.vlt"))
+    for arg in cfg_const.COMPILE_ARGS + BUILD_ARGS + cfg_const._get_cfg_args(flavor):
+        sha.update(arg.encode())
+    sha.update(cfg_const.PROFILE.encode())
+    sha.update(cfg_const.TOPLEVEL.encode())
+    sha.update(cfg_const.SIMULATOR.encode())
+    sha.update(cocotb.__version__.encode())
+    sha.update(_tool_version().encode())
+    return sha.hexdigest()
+
+def get_build_dir(flavor, build_hash=None):
+    if build_hash is None:
+        build_hash = get_build_hash(flavor)
+    # Keep it at the same depth as the run dirs, verilator.flags points
+    # to ../../verilator_config.vlt
+    return os.path.join(RUN_DIR, f"build_{cfg_const.SIMULATOR}_{cfg_const.PROFILE}_{flavor}_{build_hash[:16]}")
+
+def _build_env():
+    # OBJCACHE is picked by the verilated.mk, the base dir strips the hashed
+    # build dir from the paths so different builds share the cache entries
+    env = dict(cfg_const.EXTRA_ENV)
+    ccache = shutil.which("ccache") if BUILD_CCACHE else None
+    if ccache is not None:
+        env['OBJCACHE'] = ccache
+        env['CCACHE_BASEDIR'] = os.path.abspath(RUN_DIR)
+        env['CCACHE_NOHASHDIR'] = "1"
+        env['CCACHE_DIR'] = os.getenv("CCACHE_DIR", os.path.join(os.path.abspath(RUN_DIR), ".ccache"))
+    return env
+
+def _sim_kwargs(module, flavor, testcase=None):
+    return dict(
+        python_search=[cfg_const.TESTS_DIR],
+        includes=cfg_const.INC_DIR,
+        verilog_sources=cfg_const._get_sources(flavor),
+        toplevel=cfg_const.TOPLEVEL,
+        module=module,
+        compile_args=cfg_const.COMPILE_ARGS,
+        extra_env=cfg_const.EXTRA_ENV,
+        extra_args=cfg_const._get_cfg_args(flavor),
+        testcase=testcase
+    )
+
+def build_model(module, flavor):
+    """
+    Builds the model for the flavor once and shares it between all the
+    test modules, the lock makes it safe with pytest -n auto. Changes in
+    the python side never rebuild (not part of the hash) and RTL changes
+    only recompile the objects that changed through ccache.
+    """
+    build_hash = get_build_hash(flavor)
+    build_dir  = get_build_dir(flavor, build_hash)
+    stamp      = os.path.join(build_dir, BUILD_STAMP)
+    os.makedirs(build_dir, exist_ok=True)
+
+    with open(os.path.join(RUN_DIR, f".lock_{build_hash[:16]}"), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if os.path.isfile(stamp):
+                with open(stamp) as f:
+                    if f.read().strip() == build_hash:
+                        return build_dir
+            start  = time.monotonic()
+            kwargs = _sim_kwargs(module, flavor)
+            kwargs['compile_args'] = kwargs['compile_args']+BUILD_ARGS
+            kwargs['extra_env'] = _build_env()
+            kwargs['waves'] = False # Tracing comes from the profile
+            make_args = ["-j", str(BUILD_JOBS)]+cfg_const.BUILD_PROFILES[cfg_const.PROFILE]['make_args']
+            Verilator(sim_build=build_dir, work_dir=build_dir, compile_only=True,
+                      make_args=make_args, **kwargs).run()
+            with open(stamp, 'w') as f:
+                f.write(build_hash)
+            logging.getLogger("cocotb.build").info("Built %s in %.1fs (%s)", build_dir, time.monotonic()-start,
+                                                   "ccache" if 'OBJCACHE' in kwargs['extra_env'] else "no ccache")
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return build_dir
+
+def get_work_dir(module, flavor, testcase=None):
+    if testcase is not None:
+        return os.path.join(RUN_DIR, f"run_{cfg_const.SIMULATOR}_{module}_{flavor}_{testcase}")
+    return os.path.join(RUN_DIR, f"run_{cfg_const.SIMULATOR}_{module}_{flavor}")
+
+def run_sim(module, flavor, testcase=None):
+    """
+    Runs the cocotb module against the shared model of the flavor, logs,
+    waves and coverage still land in the per module/flavor run dir. A
+    testcase (e.g. run_test_002) only runs that TestFactory variant.
+    """
+    work_dir = get_work_dir(module, flavor, testcase)
+    os.makedirs(work_dir, exist_ok=True)
+    cfg_const.EXTRA_ENV['FLAVOR'] = flavor
+
+    if cfg_const.SIMULATOR != "verilator":
+        cfg_const.EXTRA_ENV['SIM_BUILD'] = work_dir
+        return run(sim_build=work_dir, **_sim_kwargs(module, flavor, testcase))
+
+    build_dir = build_model(module, flavor)
+    cfg_const.EXTRA_ENV['SIM_BUILD'] = build_dir
+    traced = cfg_const.PROFILE == "debug"
+    kwargs = _sim_kwargs(module, flavor, testcase)
+    # The seed is fixed here so a failing run can be replayed with waves
+    kwargs['extra_env'] = dict(kwargs['extra_env'])
+    kwargs['extra_env'].setdefault('RANDOM_SEED', os.getenv("RANDOM_SEED", str(random.getrandbits(32))))
+    sim = cached_verilator(sim_build=build_dir, work_dir=work_dir,
+                           trace_file=os.path.join(work_dir, "dump.fst") if traced and cfg_const.WAVES == "all" else None,
+                           **kwargs)
+    try:
+        return sim.run()
+    except SystemExit:
+        if traced and cfg_const.WAVES == "fail":
+            log = logging.getLogger("cocotb.build")
+            trace_file = os.path.join(work_dir, "dump_fail.fst")
+            log.error("Failed %s, running it again (RANDOM_SEED=%s) with waves in %s: %s", module,
+                      kwargs['extra_env']['RANDOM_SEED'], trace_file, ",".join(sim.failed_tests()))
+            try:
+                cached_verilator(sim_build=build_dir, work_dir=work_dir, trace_file=trace_file, **kwargs).run()
+            except SystemExit:
+                pass
+        raise
@@ -4,17 +4,22 @@
 # License           : MIT license <Check LICENSE>
 # Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
 # Date              : 03.06.2022
-# Last Modified Date: 05.01.2023
+# Last Modified Date: 18.10.2026
 import os
 import glob
 import copy
 import math
+import itertools
+from common.csr_map import load_csr_map
+from common.csr_scale import scale_csr
 
 class cfg_const:
     ################### Start Configure ####################
     regression_setup = ['32', '64','small']
     RST_CYCLES  = 3
     TIMEOUT_VAL = 20000
+    TIMEOUT_BEAT_CYCLES  = 8  # Budget per data beat, covers idle/backpressure
+    TIMEOUT_BURST_CYCLES = 32 # Budget per AXI burst (addr + resp handshakes)
 
     DMA_CFG_32b = {}
     DMA_CFG_32b['axi_addr_width'] = 32
@@ -30,25 +35,88 @@ class cfg_const:
     DMA_CFG_SMALL['dma_max_beat_burst'] = 8
     DMA_CFG_SMALL['dma_en_unaligned']   = 0
 
-    DMA_CSRs = {}
-    #-------------------------------> Addr     Mask       RW
-    DMA_CSRs['DMA_CONTROL']        = (0x0000, 0x3FF,      1)
-    DMA_CSRs['DMA_STATUS']         = (0x0008, 0xCAFE,     0)
-    DMA_CSRs['DMA_ERROR_ADDR']     = (0x0010, 0x0,        0)
-    DMA_CSRs['DMA_ERROR_MISC']     = (0x0018, 0x0,        0)
-    NUM_DESC       = 2
-    PER_DESC_CSRS  = 4
-    CSR_ADDR_ALIG  = 8
-    BASE_ADDR_DESC = 0x20
-    for i in range(0, NUM_DESC):
-        DMA_CSRs['DMA_DESC_SRC_ADDR_'  +str(i)] = (BASE_ADDR_DESC+(0*(NUM_DESC*8))+(i*CSR_ADDR_ALIG), 0xFFFFFFFF, 1)
-        DMA_CSRs['DMA_DESC_DST_ADDR_'  +str(i)] = (BASE_ADDR_DESC+(1*(NUM_DESC*8))+(i*CSR_ADDR_ALIG), 0xFFFFFFFF, 1)
-        DMA_CSRs['DMA_DESC_NUM_BYTES_' +str(i)] = (BASE_ADDR_DESC+(2*(NUM_DESC*8))+(i*CSR_ADDR_ALIG), 0xFFFFFFFF, 1)
-        DMA_CSRs['DMA_DESC_WRITE_MODE_'+str(i)] = (BASE_ADDR_DESC+(3*(NUM_DESC*8))+(i*CSR_ADDR_ALIG), 0x7,        1)
-        DMA_CSRs['DMA_DESC_READ_MODE_' +str(i)] = (BASE_ADDR_DESC+(3*(NUM_DESC*8))+(i*CSR_ADDR_ALIG), 0x7,        1)
-        DMA_CSRs['DMA_DESC_ENABLE_'    +str(i)] = (BASE_ADDR_DESC+(3*(NUM_DESC*8))+(i*CSR_ADDR_ALIG), 0x7,        1)
+    # Defaults of rtl/inc/dma_pkg.svh, overridden by the flavor defines
+    DMA_RTL_DEFAULTS = {}
+    DMA_RTL_DEFAULTS['axi_addr_width']     = 32
+    DMA_RTL_DEFAULTS['axi_data_width']     = 32
+    DMA_RTL_DEFAULTS['dma_bytes_width']    = 32
+    DMA_RTL_DEFAULTS['dma_rd_txn_buff']    = 8
+    DMA_RTL_DEFAULTS['dma_wr_txn_buff']    = 8
+    DMA_RTL_DEFAULTS['dma_fifo_depth']     = 16
+    DMA_RTL_DEFAULTS['dma_max_beat_burst'] = 256
+    DMA_RTL_DEFAULTS['dma_en_unaligned']   = 1
+    DMA_RTL_DEFAULTS['dma_max_burst_en']   = 1
+    DMA_RTL_DEFAULTS['dma_num_desc']       = 2
+
+    # Performance sweep, every combination becomes a perf_* flavor
+    PERF_GRID = {}
+    PERF_GRID['axi_data_width']     = [32, 64]
+    PERF_GRID['dma_fifo_depth']     = [4, 16]
+    PERF_GRID['dma_rd_txn_buff']    = [2, 8]
+    PERF_GRID['dma_wr_txn_buff']    = [2, 8]
+    PERF_GRID['dma_max_beat_burst'] = [16, 256]
+    PERF_XFER_SIZES = [256, 4096, 65536]
+    PERF_XFER_ALIGN = [0, 3]
+    PERF_MAX_BURST  = [0, 15, 255]
+    PERF_THRESHOLD  = 0.05 # Max allowed drop against the baseline
+
+    # Descriptor count sweep (DMA_SCALING=1), every N becomes a ndesc_* flavor
+    # built with DMA_NUM_DESC=N and the CSR block scaled to N descriptors
+    NDESC_SWEEP      = [2, 4, 8, 16, 32]
+    NDESC_XFER_SIZES = [64, 1024]
+
+    # Small transfer latency (DMA_LATENCY=1), cycles of each setup/run phase
+    SMALL_XFER_SIZES = [64, 128, 256, 512]
+    SMALL_XFER_ALIGN = [0, 1, 3] # Unaligned ones skipped without DMA_EN_UNALIGNED
+
+    # Internal signals probed by the Tb (wave ring, occupancy histograms)
+    DUT_PATHS = {}
+    DUT_PATHS['fsm_state'] = "u_dma_axi_wrapper.u_dma_func_wrapper.u_dma_fsm.cur_st_ff"
+    DUT_PATHS['fifo_ocup'] = "u_dma_axi_wrapper.u_dma_func_wrapper.u_dma_fifo.ocup_o"
+    DUT_PATHS['rd_pend']   = "u_dma_axi_wrapper.u_dma_func_wrapper.u_dma_axi_if.rd_counter_ff"
+    DUT_PATHS['wr_pend']   = "u_dma_axi_wrapper.u_dma_func_wrapper.u_dma_axi_if.wr_counter_ff"
+
+    # dma_m memory timing models (Tb mem_model= or DMA_MEM_MODEL), latencies
+    # in cycles as int, (min, max) or [(cycles, weight), ...]. None is the
+    # zero latency AxiRam
+    MEM_PROFILES = {}
+    MEM_PROFILES['sram'] = {'rd_latency': 2, 'wr_latency': 1, 'max_outstanding': 4,
+                            'bytes_per_cycle': None, 'order': 'in_order'}
+    MEM_PROFILES['sram_ic'] = {'rd_latency': (8, 16), 'wr_latency': (4, 8), 'max_outstanding': 8,
+                               'bytes_per_cycle': None, 'order': 'per_id'}
+    # Row hits/misses/refresh, a 4B/cycle channel shared by rd and wr (the
+    # whole bus on the 32b/small flavors, half of it on the 64b one)
+    MEM_PROFILES['ddr'] = {'rd_latency': [(30, 70), (60, 25), (200, 5)], 'wr_latency': (20, 40),
+                           'max_outstanding': 16, 'bytes_per_cycle': 4, 'order': 'per_id'}
+    MEM_MODEL = os.getenv("DMA_MEM_MODEL")
+    # Seed of the prefilled RAM images (run_dir/images), fixed so all the runs share them
+    IMAGE_SEED = int(os.getenv("DMA_IMAGE_SEED", 0))
+
+    # Soak run (DMA_SOAK=1), stops when the first of the budgets runs out
+    SOAK_CYCLES        = int(os.getenv("DMA_SOAK_CYCLES", 10_000_000))
+    SOAK_WALL_SECS     = float(os.getenv("DMA_SOAK_SECS", 1800))
+    SOAK_WINDOW_CYCLES = 100_000 # Sustained throughput report interval
+    SOAK_MEM_SIZE      = 64*1024
+
+    # DMA_CSRs / NUM_DESC come from the rggen output (csr_out), see below
+    CSR_ALIASES = {}
+    CSR_ALIASES['DMA_ERROR_STATS'] = ['DMA_ERROR_MISC']
+    CSR_ALIASES['DMA_DESC_CFG']    = ['DMA_DESC_WRITE_MODE','DMA_DESC_READ_MODE','DMA_DESC_ENABLE']
     ################### End Configure ####################
 
+    DMA_CFG_PERF = {}
+    for point in itertools.product(*PERF_GRID.values()):
+        cfg = dict(zip(PERF_GRID.keys(), point))
+        cfg['axi_addr_width'] = 32
+        name = "perf_d{}_f{}_rt{}_wt{}_b{}".format(*point)
+        DMA_CFG_PERF[name] = cfg
+    perf_setup = list(DMA_CFG_PERF.keys())
+
+    DMA_CFG_NDESC = {}
+    for _n in NDESC_SWEEP:
+        DMA_CFG_NDESC[f"ndesc_{_n}"] = {'axi_addr_width': 32, 'axi_data_width': 32, 'dma_num_desc': _n}
+    ndesc_setup = list(DMA_CFG_NDESC.keys())
+
     CLK_100MHz  = (10, "ns")
     CLK_200MHz  = (5, "ns")
     TIMEOUT_AXI = (CLK_100MHz[0]*TIMEOUT_VAL, "ns")
@@ -64,7 +132,27 @@ class cfg_const:
     RTL_DIR   = os.path.join(TESTS_DIR,"../../rtl/")
     RGGEN_V_DIR = os.path.join(TESTS_DIR,"../../rggen-verilog-rtl/")
     CSR_RGGEN_DIR = os.path.join(TESTS_DIR,"../../csr_out/")
+    RUN_DIR   = os.path.join(TESTS_DIR,"../../run_dir/")
     INC_DIR   = [f'{RTL_DIR}inc',f'{RGGEN_V_DIR}']
+
+    # The simulation of a ndesc_* flavor sees the map of its scaled CSR block
+    CSR_DIR = CSR_RGGEN_DIR
+    if os.getenv("FLAVOR") in DMA_CFG_NDESC:
+        CSR_DIR = scale_csr(CSR_RGGEN_DIR, DMA_CFG_NDESC[os.getenv("FLAVOR")]['dma_num_desc'],
+                            os.path.join(RUN_DIR, f"csr_{os.getenv('FLAVOR')}"))
+    CSR_MAP = load_csr_map(CSR_DIR, RUN_DIR)
+    DMA_CSRs = {}
+    #---------> Name -> (Addr, Mask (RW) or reset value (RO), RW)
+    for _off in sorted(CSR_MAP.regs):
+        _reg  = CSR_MAP.regs[_off]
+        _name = _reg['name'].upper()
+        for _alias in CSR_ALIASES.get(_name, [_name]):
+            _key = _alias if _reg['idx'] is None else _alias+'_'+str(_reg['idx'])
+            DMA_CSRs[_key] = (_off, _reg['mask'] if _reg['rw'] else _reg['init'], _reg['rw'])
+    NUM_DESC       = CSR_MAP.num_desc
+    PER_DESC_CSRS  = len(CSR_MAP.arrays)
+    CSR_ADDR_ALIG  = 8
+    BASE_ADDR_DESC = CSR_MAP.array('dma_desc_src_addr')[0]
     VERILOG_SOURCES = [] # The sequence below is important...
     VERILOG_SOURCES = VERILOG_SOURCES + glob.glob(f'{RGGEN_V_DIR}/rggen_rtl_macros.vh',recursive=True)
     VERILOG_SOURCES = VERILOG_SOURCES + glob.glob(f'bus_arch_sv_pkg/amba_axi_pkg.sv',recursive=True)
@@ -75,9 +163,28 @@ class cfg_const:
     VERILOG_SOURCES = VERILOG_SOURCES + glob.glob(f'{CSR_RGGEN_DIR}**/*.v',recursive=True)
     VERILOG_SOURCES = VERILOG_SOURCES + glob.glob(f'{RGGEN_V_DIR}**/*.v',recursive=True)
     PATH_RUN     = str(os.getenv("PATH_RUN"))
-    COMPILE_ARGS = ["-f",os.path.join(PATH_RUN,"verilator.flags"),"--coverage","--coverage-line","--coverage-toggle"]
+    # Build profiles (DMA_PROFILE), each one is built and cached on its own.
+    # Waves are compiled only in debug and dumped only when asked at runtime
+    BUILD_PROFILES = {}
+    BUILD_PROFILES['debug']    = {'args': ["--trace","--trace-fst","--trace-structs","--trace-depth","10000",
+                                           "--trace-max-array","10000","--trace-max-width","10000",
+                                           "--coverage","--coverage-line","--coverage-toggle"],
+                                  'make_args': []}
+    BUILD_PROFILES['coverage'] = {'args': ["--coverage","--coverage-line","--coverage-toggle"],
+                                  'make_args': []}
+    BUILD_PROFILES['perf']     = {'args': ["-O3","--x-initial","fast","--noassert"],
+                                  'make_args': ["OPT_FAST=-O3","OPT_SLOW=-O1"]}
+    PROFILE = os.getenv("DMA_PROFILE", "debug")
+    # Waves at runtime: off, fail (failing jobs run again dumping waves), all
+    # or ring (the Tb keeps the last WAVE_RING_CYCLES and dumps them on errors)
+    WAVES = os.getenv("DMA_WAVES", "fail")
+    WAVE_RING_CYCLES = int(os.getenv("DMA_WAVE_RING_CYCLES", 2000))
+    WAVE_RING_POST   = 32 # Cycles still captured after dma_error_o rises
+    if PROFILE not in BUILD_PROFILES:
+        raise ValueError(f"Unknown DMA_PROFILE {PROFILE}, use one of {list(BUILD_PROFILES)}")
+    COMPILE_ARGS = ["-f",os.path.join(PATH_RUN,"verilator.flags")]+BUILD_PROFILES[PROFILE]['args']
     if SIMULATOR == "verilator":
-        EXTRA_ARGS = ["--trace-fst","--trace-structs","--Wno-UNOPTFLAT","--Wno-REDEFMACRO"]
+        EXTRA_ARGS = ["--Wno-UNOPTFLAT","--Wno-REDEFMACRO"]
     else:
         EXTRA_ARGS = []
 
@@ -92,10 +199,42 @@ class cfg_const:
     for param in DMA_CFG_SMALL.items():
         EXTRA_ARGS_SMALL.append("-D"+param[0].upper()+"="+str(param[1]))
 
+    def _get_cfg(flavor):
+        if flavor == "32":
+            return cfg_const.DMA_CFG_32b
+        elif flavor == "64":
+            return cfg_const.DMA_CFG_64b
+        elif flavor in cfg_const.DMA_CFG_PERF:
+            return cfg_const.DMA_CFG_PERF[flavor]
+        elif flavor in cfg_const.DMA_CFG_NDESC:
+            return cfg_const.DMA_CFG_NDESC[flavor]
+        else:
+            return cfg_const.DMA_CFG_SMALL
+
     def _get_cfg_args(flavor):
         if flavor == "32":
             return cfg_const.EXTRA_ARGS_32b
         elif flavor == "64":
             return cfg_const.EXTRA_ARGS_64b
+        elif flavor in cfg_const.DMA_CFG_PERF or flavor in cfg_const.DMA_CFG_NDESC:
+            extra_args = copy.deepcopy(cfg_const.EXTRA_ARGS)
+            for param in cfg_const._get_cfg(flavor).items():
+                extra_args.append("-D"+param[0].upper()+"="+str(param[1]))
+            return extra_args
         else:
             return cfg_const.EXTRA_ARGS_SMALL
+
+    def _get_csr_dir(flavor):
+        if flavor in cfg_const.DMA_CFG_NDESC:
+            return scale_csr(cfg_const.CSR_RGGEN_DIR, cfg_const.DMA_CFG_NDESC[flavor]['dma_num_desc'],
+                             os.path.join(cfg_const.RUN_DIR, f"csr_{flavor}"))
+        return cfg_const.CSR_RGGEN_DIR
+
+    def _get_sources(flavor):
+        # Same sequence, the rggen CSR block swapped for the scaled one
+        csr_dir = cfg_const._get_csr_dir(flavor)
+        if csr_dir == cfg_const.CSR_RGGEN_DIR:
+            return cfg_const.VERILOG_SOURCES
+        csr_srcs = glob.glob(f'{cfg_const.CSR_RGGEN_DIR}**/*.v',recursive=True)
+        return [os.path.join(csr_dir, os.path.basename(src)) if src in csr_srcs else src
+                for src in cfg_const.VERILOG_SOURCES]
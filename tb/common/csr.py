@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : csr.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+from common.constants import cfg_const
+
+class csr_reg:
+    def __init__(self, name, addr, mask, rw, volatile=0, init=None):
+        self.names    = [name]
+        self.addr     = addr
+        self.rw       = rw
+        self.init     = init # rggen reset value, None when not known
+        # For RW CSRs the table holds the writable mask, for RO ones the
+        # value the hardware returns (e.g. the 0xCAFE version)
+        self.mask     = mask if rw else 0
+        self.value    = None if rw else mask
+        self.volatile = volatile # Bits updated by the hardware
+
+class csr_model:
+    """
+    Host-side mirror of the DMA CSRs built from cfg_const.DMA_CSRs, it
+    tracks what the Tb wrote so reads of non-volatile bits can be served
+    without going through the AXI Lite bus.
+    """
+    # Fields driven by the DMA itself, always read from the bus
+    VOLATILE = {
+        'DMA_STATUS':     0x30000,    # done[16] / error[17]
+        'DMA_ERROR_ADDR': 0xFFFFFFFF, # error_addr
+        'DMA_ERROR_MISC': 0x7         # error_stats
+    }
+
+    def __init__(self, csrs=None, inits=None):
+        if csrs is None:
+            csrs = cfg_const.DMA_CSRs
+            inits = {off: reg['init'] for off, reg in cfg_const.CSR_MAP.regs.items()}
+        inits = inits or {}
+        self.regs = {}
+        for name, (addr, mask, rw) in csrs.items():
+            if addr in self.regs:
+                # Fields sharing the same CSR (e.g. DESC_CFG)
+                self.regs[addr].names.append(name)
+                if rw:
+                    self.regs[addr].mask |= mask
+            else:
+                self.regs[addr] = csr_reg(name, addr, mask, rw, self.VOLATILE.get(name, 0), inits.get(addr))
+        self.hits   = 0
+        self.misses = 0
+
+    def reset(self):
+        # RW CSRs back to their rggen reset values (from CSR_MAP)
+        for reg in self.regs.values():
+            if reg.rw:
+                reg.value = None if reg.init is None else reg.init & reg.mask
+
+    def write(self, addr, value):
+        reg = self.regs.get(addr)
+        if reg is not None and reg.rw:
+            reg.value = value & reg.mask
+
+    def invalidate(self, addr):
+        reg = self.regs.get(addr)
+        if reg is not None and reg.rw:
+            reg.value = None
+
+    def lookup(self, addr, mask=None):
+        # Value to serve from the mirror or None when the bus is needed
+        reg = self.regs.get(addr)
+        if reg is None or reg.value is None:
+            return None
+        if mask is None:
+            mask = 0xFFFFFFFF
+        if reg.volatile & mask:
+            return None
+        return reg.value & mask
+
+    def read(self, addr, mask=None):
+        value = self.lookup(addr, mask)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def update(self, addr, value):
+        # Value read from the hardware
+        reg = self.regs.get(addr)
+        if reg is not None and reg.rw and reg.volatile == 0:
+            reg.value = value & reg.mask
+
+    def check(self, addr, value):
+        # Compares a hardware read against the mirror, volatile bits ignored
+        reg = self.regs.get(addr)
+        if reg is None or reg.value is None:
+            return True
+        return (value & ~reg.volatile) == (reg.value & ~reg.volatile)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
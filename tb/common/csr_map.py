@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : csr_map.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import os
+import re
+import json
+import hashlib
+
+# Sources generated by rggen from csr_dma.xlsx, the .md carries the access
+# type and reset value of every field that the .h does not have
+CSR_MAP_SRCS    = ["csr_dma.md", "csr_dma.h"]
+CSR_MAP_VERSION = 1
+
+_RE_REG   = re.compile(r'^### <div id="[^"]*"></div>(\w+)(?:\[(\d+)\])?\s*$')
+_RE_OFF   = re.compile(r'^\s+\* (0x[0-9a-fA-F]+)\s*$')
+_RE_FIELD = re.compile(r'^\|(\w+)\|\[(\d+)(?::(\d+))?\]\|(\w+)\|(0x[0-9a-fA-F]+)\|')
+_RE_SIZE  = re.compile(r'^#define CSR_DMA_(\w+)_ARRAY_SIZE_0 (\d+)\s*$')
+
+class csr_map:
+    """
+    Address indexed view of the rggen CSR map, every offset (array
+    entries expanded) points to its register name, index, fields, RW
+    mask and reset value.
+    """
+    def __init__(self, table):
+        self.regs   = {int(off): reg for off, reg in table['regs'].items()}
+        self.arrays = table['arrays']
+        self.byname = {}
+        for off, reg in self.regs.items():
+            self.byname[(reg['name'], reg['idx'])] = off
+
+    @property
+    def num_desc(self):
+        return len(self.arrays['dma_desc_cfg'])
+
+    def addr(self, name, idx=None):
+        return self.byname[(name, idx)]
+
+    def array(self, name):
+        # Offsets of the array register, indexed by the entry
+        return self.arrays[name]
+
+def _parse(csr_dir):
+    regs   = {}
+    arrays = {}
+    cur    = None
+    with open(os.path.join(csr_dir, "csr_dma.md")) as f:
+        for line in f:
+            m = _RE_REG.match(line)
+            if m:
+                cur = {'name': m.group(1), 'size': m.group(2), 'offs': [], 'fields': []}
+                regs[cur['name']] = cur
+                continue
+            if cur is None:
+                continue
+            m = _RE_OFF.match(line)
+            if m:
+                cur['offs'].append(int(m.group(1), 16))
+                continue
+            m = _RE_FIELD.match(line)
+            if m:
+                msb   = int(m.group(2))
+                lsb   = int(m.group(3)) if m.group(3) is not None else msb
+                cur['fields'].append([m.group(1), lsb, msb-lsb+1, m.group(4), int(m.group(5), 16)])
+
+    # Cross check the array sizes with the C header
+    with open(os.path.join(csr_dir, "csr_dma.h")) as f:
+        for line in f:
+            m = _RE_SIZE.match(line)
+            if m:
+                name = m.group(1).lower()
+                if name not in regs or len(regs[name]['offs']) != int(m.group(2)):
+                    raise ValueError(f"CSR map mismatch between csr_dma.h and csr_dma.md for {name}")
+
+    table = {}
+    for name, reg in regs.items():
+        mask = 0
+        init = 0
+        for fname, lsb, width, access, reset in reg['fields']:
+            if access == 'rw':
+                mask |= ((1<<width)-1)<<lsb
+            init |= reset<<lsb
+        if reg['size'] is not None:
+            arrays[name] = reg['offs']
+        for idx, off in enumerate(reg['offs']):
+            table[off] = {'name': name,
+                          'idx': idx if reg['size'] is not None else None,
+                          'fields': reg['fields'],
+                          'mask': mask,
+                          'rw': int(mask != 0),
+                          'init': init}
+    return {'version': CSR_MAP_VERSION, 'regs': table, 'arrays': arrays}
+
+def _get_hash(csr_dir):
+    sha = hashlib.sha256()
+    sha.update(str(CSR_MAP_VERSION).encode())
+    for src in CSR_MAP_SRCS:
+        with open(os.path.join(csr_dir, src), 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+def load_csr_map(csr_dir, cache_dir=None):
+    """
+    Parses the rggen output once, the result is stored in cache_dir
+    keyed by the hash of the sources so later imports only load a JSON.
+    """
+    cache = None
+    if cache_dir is not None:
+        cache = os.path.join(cache_dir, f"csr_map_{_get_hash(csr_dir)[:16]}.json")
+        if os.path.isfile(cache):
+            try:
+                with open(cache) as f:
+                    return csr_map(json.load(f))
+            except (OSError, ValueError):
+                pass
+    table = _parse(csr_dir)
+    if cache is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Atomic as several pytest workers import it at once
+            tmp = f"{cache}.{os.getpid()}"
+            with open(tmp, 'w') as f:
+                json.dump(table, f)
+            os.replace(tmp, cache)
+        except OSError:
+            pass
+    return csr_map(table)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : csr_scale.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import os
+import re
+import math
+
+# The rggen output (csr_out) is generated for the default DMA_NUM_DESC,
+# these rewrite it for N descriptors keeping the rggen layout: the scalar
+# registers first and then each descriptor array packed one after the other
+CSR_SRCS = ["csr_dma.v", "csr_dma.md", "csr_dma.h"]
+REG_SIZE = 8 # 64b bus
+
+_RE_ARRAY = re.compile(r'^### <div id="[^"]*"></div>(\w+)\[(\d+)\]\s*$')
+_RE_OFF   = re.compile(r'^\s+\* (0x[0-9a-fA-F]+)\s*$')
+
+def _layout(src_dir):
+    # Array names in address order, the first offset and the entries of each
+    arrays = []
+    with open(os.path.join(src_dir, "csr_dma.md")) as f:
+        lines = f.read().splitlines()
+    for idx, line in enumerate(lines):
+        m = _RE_ARRAY.match(line)
+        if m:
+            first = next(int(o.group(1), 16) for o in map(_RE_OFF.match, lines[idx+1:]) if o)
+            arrays.append((m.group(1), first, int(m.group(2))))
+    if len(arrays) == 0:
+        raise ValueError(f"No register arrays in {src_dir}/csr_dma.md")
+    return arrays
+
+class csr_layout:
+    def __init__(self, src_dir, num_desc):
+        arrays         = _layout(src_dir)
+        self.num_desc  = num_desc
+        self.old_desc  = arrays[0][2]
+        self.base      = arrays[0][1] # First array offset, scalars below it
+        self.scalars   = self.base//REG_SIZE
+        self.names     = [name for name, _, _ in arrays]
+        self.offs      = {name: self.base+(k*num_desc*REG_SIZE) for k, name in enumerate(self.names)}
+        self.registers = self.scalars+(len(self.names)*num_desc)
+        end            = self.base+(len(self.names)*num_desc*REG_SIZE)
+        # rggen rounds the block to a power of 2, 256B at least as the original
+        self.byte_size = max(256, 2**math.ceil(math.log2(end)))
+        self.addr_bits = int(math.log2(self.byte_size))
+
+    def slot(self, name):
+        # First register index of the array in the w_register_* vectors
+        return self.scalars+(self.names.index(name)*self.num_desc)
+
+def _scale_v(src, lay):
+    n, old, aw, regs = lay.num_desc, lay.old_desc, lay.addr_bits, lay.registers
+    out   = []
+    array = None
+    for line in src.splitlines():
+        m = re.match(r'\s*generate if \(1\) begin : g_(\w+)', line)
+        if m:
+            array = m.group(1) if m.group(1) in lay.names else None
+        line = re.sub(r'parameter ADDRESS_WIDTH = \d+,', f'parameter ADDRESS_WIDTH = {aw},', line)
+        line = re.sub(r'wire \[\d+:0\] w_register_address;', f'wire [{aw-1}:0] w_register_address;', line)
+        line = re.sub(r'\.LOCAL_ADDRESS_WIDTH  \(\d+\)', f'.LOCAL_ADDRESS_WIDTH  ({aw})', line)
+        line = re.sub(r'\.REGISTERS            \(\d+\)', f'.REGISTERS            ({regs})', line)
+        line = re.sub(r'\.BYTE_SIZE            \(\d+\)', f'.BYTE_SIZE            ({lay.byte_size})', line)
+        line = re.sub(r'\.ADDRESS_WIDTH  \(\d+\)', f'.ADDRESS_WIDTH  ({aw})', line)
+        for vec, width in (('active', 1), ('ready', 1), ('status', 2), ('read_data', 64), ('value', 64)):
+            line = re.sub(rf'wire \[\d+:0\] w_register_{vec};', f'wire [{(width*regs)-1}:0] w_register_{vec};', line)
+        # Descriptor outputs, width*N bits each
+        m = re.match(r'(\s*output )\[(\d+):0\]( o_(\w+),?)$', line)
+        if m and any(m.group(4).startswith(name+'_') for name in lay.names):
+            width = (int(m.group(2))+1)//old
+            line  = f"{m.group(1)}[{(width*n)-1}:0]{m.group(3)}"
+        m = re.match(r'(\s*\.OFFSET_ADDRESS \()\d+\'h([0-9a-fA-F]+)(\),?)$', line)
+        if m:
+            off  = lay.offs[array] if array is not None else int(m.group(2), 16)
+            line = f"{m.group(1)}{aw}'h{off:02x}{m.group(3)}"
+        if array is not None:
+            line = line.replace(f'i < {old};', f'i < {n};')
+            line = re.sub(r'\*\(\d+\+i\)', f'*({lay.slot(array)}+i)', line)
+        out.append(line)
+    return "\n".join(out)+"\n"
+
+def _offs_md(lay, name):
+    return [lay.offs[name]+(i*REG_SIZE) for i in range(lay.num_desc)]
+
+def _scale_md(src, lay):
+    n   = lay.num_desc
+    out = []
+    skip = False
+    for line in src.splitlines():
+        if skip:
+            if _RE_OFF.match(line):
+                continue
+            skip = False
+        m = re.match(r'^\|\[(\w+)\[\d+\]\]\((#[^)]*)\)\|', line)
+        if m and m.group(1) in lay.names:
+            offs = "<br>".join(f"0x{o:02x}" for o in _offs_md(lay, m.group(1)))
+            out.append(f"|[{m.group(1)}[{n}]]({m.group(2)})|{offs}|")
+            continue
+        m = _RE_ARRAY.match(line)
+        if m:
+            out.append(line.replace(f"[{m.group(2)}]", f"[{n}]"))
+            continue
+        if line.strip() == "* offset_address" and len(out) > 0:
+            # Offsets of the array section that was just opened
+            hdr = next((l for l in reversed(out) if l.startswith("### ")), "")
+            m   = _RE_ARRAY.match(hdr)
+            if m:
+                out.append(line)
+                out.extend(f"    * 0x{o:02x}" for o in _offs_md(lay, m.group(1)))
+                skip = True
+                continue
+        if out[-1:] == ["* byte_size"]:
+            line = f"    * {lay.byte_size}"
+        out.append(line)
+    return "\n".join(out)+"\n"
+
+def _scale_h(src, lay):
+    n   = lay.num_desc
+    out = []
+    for line in src.splitlines():
+        m = re.match(r'#define CSR_DMA_(\w+?)_(ARRAY_SIZE_0|BYTE_SIZE|BYTE_OFFSET_(\d+)) ', line)
+        name = m.group(1).lower() if m else None
+        if name in lay.names:
+            if m.group(2) == "ARRAY_SIZE_0":
+                line = f"#define CSR_DMA_{m.group(1)}_ARRAY_SIZE_0 {n}"
+            elif m.group(2) == "BYTE_SIZE":
+                line = f"#define CSR_DMA_{m.group(1)}_BYTE_SIZE {n*REG_SIZE}"
+            elif m.group(3) != "0":
+                continue
+            else:
+                out.extend(f"#define CSR_DMA_{m.group(1)}_BYTE_OFFSET_{i} 0x{o:x}"
+                           for i, o in enumerate(_offs_md(lay, name)))
+                continue
+        m = re.match(r'(\s*uint64_t (\w+))\[\d+\];', line)
+        if m and m.group(2) in lay.names:
+            line = f"{m.group(1)}[{n}];"
+        if re.match(r'\s*uint64_t __reserved_0x', line):
+            continue
+        if line.startswith("} csr_dma_t;"):
+            end = lay.base+(len(lay.names)*n*REG_SIZE)
+            out.extend(f"  uint64_t __reserved_0x{o:x};" for o in range(end, lay.byte_size, REG_SIZE))
+        out.append(line)
+    return "\n".join(out)+"\n"
+
+def scale_csr(src_dir, num_desc, out_dir):
+    """
+    Writes csr_dma.v/.md/.h for num_desc descriptors in out_dir and returns
+    it, files already up to date are left untouched.
+    """
+    lay = csr_layout(src_dir, num_desc)
+    os.makedirs(out_dir, exist_ok=True)
+    for name, scale in zip(CSR_SRCS, (_scale_v, _scale_md, _scale_h)):
+        dst = os.path.join(out_dir, name)
+        with open(os.path.join(src_dir, name)) as f:
+            content = scale(f.read(), lay)
+        if os.path.isfile(dst):
+            with open(dst) as f:
+                if f.read() == content:
+                    continue
+        # Atomic as several pytest workers may generate it at once
+        tmp = f"{dst}.{os.getpid()}"
+        with open(tmp, 'w') as f:
+            f.write(content)
+        os.replace(tmp, dst)
+    return out_dir
@@ -4,8 +4,10 @@
 # License           : MIT license <Check LICENSE>
 # Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
 # Date              : 17.06.2022
-# Last Modified Date: 20.06.2022
+# Last Modified Date: 18.10.2026
 import enum
+import array
+import struct
 import logging
 from common.constants import cfg_const
 
@@ -21,6 +23,16 @@ class dma_addr(enum.Enum):
     BYT = 3
     CFG = 4
 
+# Offsets of every descriptor CSR, indexed by [dma_addr][desc_id]
+_DESC_ADDR = {
+    dma_addr.SRC: cfg_const.CSR_MAP.array('dma_desc_src_addr'),
+    dma_addr.DST: cfg_const.CSR_MAP.array('dma_desc_dst_addr'),
+    dma_addr.BYT: cfg_const.CSR_MAP.array('dma_desc_num_bytes'),
+    dma_addr.CFG: cfg_const.CSR_MAP.array('dma_desc_cfg')
+}
+_REG = struct.Struct('<Q') # One CSR slot of the image
+_log = logging.getLogger("cocotb.dma_desc")
+
 class dma_err_type(enum.Enum):
     def __str__(self):
         return str(self.value)
@@ -104,6 +116,9 @@ class dma_error_stats:
         return self._value
 
 class dma_desc:
+    # Built by the thousands in soak runs, so no per object logger or dict
+    __slots__ = ('_did', '_src', '_dst', '_nbytes', '_wr_m', '_rd_m', '_en', '_cfg')
+
     def __init__(self, desc_id, src, dst, nbytes, wr_m, rd_m, en):
         self._did    = desc_id
         self._src    = src
@@ -113,30 +128,15 @@ class dma_desc:
         self._en     = en
         self._nbytes = nbytes
         self._cfg    = (en<<2) | (rd_m.value<<1) | (wr_m.value)
-        self.log     = logging.getLogger(f"cocotb.dma_desc.{self._did}")
-        self.log.info(f'DMA Descriptor {self._did}:')
-        self.log.info(f'Src    = [{hex(self._src)}]')
-        self.log.info(f'Dst    = [{hex(self._dst)}]')
-        self.log.info(f'Size   = [{self._nbytes}]B ~ [{self._nbytes//1024}]KB')
-        self.log.info(f'Write  = [{self._wr_m}]')
-        self.log.info(f'Read   = [{self._rd_m}]')
-        self.log.info(f'Enable = [{self._en}]')
+        # Only formatted when cocotb.dma_desc is at INFO
+        _log.info('%s', self)
 
     def __str__(self):
-        return f'DMA Descriptor {self._did}: Src[{hex(self._src)}] \
-                Dst[{hex(self._dst)}] Size[{self._nbytes}] \
-                Write Mode[{self._wr_m}] Read Mode[{self._rd_m}] \
-                Enable[{self._en}]'
+        return f'DMA Descriptor {self._did}: Src[{hex(self._src)}] Dst[{hex(self._dst)}] ' \
+               f'Size[{self._nbytes}] Write Mode[{self._wr_m}] Read Mode[{self._rd_m}] Enable[{self._en}]'
 
     def get_addr(self, addr):
-        if addr == dma_addr.SRC:
-            return cfg_const.BASE_ADDR_DESC+(0*(cfg_const.NUM_DESC*8))+(self._did*8)
-        elif addr == dma_addr.DST:
-            return cfg_const.BASE_ADDR_DESC+(1*(cfg_const.NUM_DESC*8))+(self._did*8)
-        elif addr == dma_addr.BYT:
-            return cfg_const.BASE_ADDR_DESC+(2*(cfg_const.NUM_DESC*8))+(self._did*8)
-        elif addr == dma_addr.CFG:
-            return cfg_const.BASE_ADDR_DESC+(3*(cfg_const.NUM_DESC*8))+(self._did*8)
+        return _DESC_ADDR[addr][self._did]
 
     # Using properties to turn all into ReadOnly mode
     @property
@@ -167,10 +167,221 @@ class dma_desc:
     def en(self):
         return self._en
 
-    @property
-    def rd_m(self):
-        return self._rd_m
-
     @property
     def cfg(self):
         return self._cfg
+
+class dma_desc_table:
+    """
+    Whole descriptor table as one uint64 array per CSR (SRC/DST/BYT/CFG,
+    indexed by desc_id). pack() gives the CSR byte image from the first
+    descriptor register on, 8B per register as the rggen map, so it can be
+    written or compared in one go instead of descriptor by descriptor.
+    """
+    __slots__ = ('num_desc', 'cols')
+
+    FIELDS = (dma_addr.SRC, dma_addr.DST, dma_addr.BYT, dma_addr.CFG)
+
+    def __init__(self, num_desc=None):
+        self.num_desc = num_desc or cfg_const.NUM_DESC
+        self.cols     = {field: array.array('Q', bytes(8*self.num_desc)) for field in self.FIELDS}
+
+    @classmethod
+    def from_descs(cls, descs, num_desc=None):
+        # Slots not in descs stay zero, so disabled
+        table = cls(num_desc)
+        for desc in descs:
+            table.set(desc.desc_id, desc.src, desc.dst, desc.nbytes, desc.wr_m, desc.rd_m, desc.en)
+        return table
+
+    @classmethod
+    def unpack(cls, image, num_desc=None):
+        table = cls(num_desc)
+        base  = cls.base()
+        for field in cls.FIELDS:
+            for idx, off in enumerate(_DESC_ADDR[field][:table.num_desc]):
+                table.cols[field][idx] = _REG.unpack_from(image, off-base)[0]
+        return table
+
+    @staticmethod
+    def base():
+        return min(_DESC_ADDR[field][0] for field in dma_desc_table.FIELDS)
+
+    def set(self, desc_id, src, dst, nbytes, wr_m=dma_mode.INCR, rd_m=dma_mode.INCR, en=1):
+        cols = self.cols
+        cols[dma_addr.SRC][desc_id] = src
+        cols[dma_addr.DST][desc_id] = dst
+        cols[dma_addr.BYT][desc_id] = nbytes
+        cols[dma_addr.CFG][desc_id] = (en<<2) | (rd_m.value<<1) | (wr_m.value)
+
+    def nbytes(self, desc_id):
+        # Bytes the DMA will move for the slot, 0 when disabled
+        return self.cols[dma_addr.BYT][desc_id] if (self.cols[dma_addr.CFG][desc_id]>>2) & 1 else 0
+
+    def pack(self):
+        base  = self.base()
+        end   = max(offs[self.num_desc-1] for offs in (_DESC_ADDR[f] for f in self.FIELDS))
+        image = bytearray(end+_REG.size-base)
+        for field in self.FIELDS:
+            col  = self.cols[field]
+            offs = _DESC_ADDR[field][:self.num_desc]
+            if offs[-1]-offs[0] == (self.num_desc-1)*_REG.size:
+                # rggen packs each array, one shot for the whole column
+                struct.pack_into(f'<{self.num_desc}Q', image, offs[0]-base, *col)
+            else:
+                for idx, off in enumerate(offs):
+                    _REG.pack_into(image, off-base, col[idx])
+        return bytes(image)
+
+    def __len__(self):
+        return self.num_desc
+
+    def __getitem__(self, desc_id):
+        cols = self.cols
+        cfg  = cols[dma_addr.CFG][desc_id]
+        return dma_desc(desc_id, cols[dma_addr.SRC][desc_id], cols[dma_addr.DST][desc_id],
+                        cols[dma_addr.BYT][desc_id], dma_mode(cfg & 1), dma_mode((cfg>>1) & 1), (cfg>>2) & 1)
+
+    def __eq__(self, other):
+        if not isinstance(other, dma_desc_table):
+            return NotImplemented
+        return self.num_desc == other.num_desc and self.cols == other.cols
+
+    def diff(self, other):
+        # desc_id of the entries that differ, for the failure messages
+        return [idx for idx in range(self.num_desc)
+                if any(self.cols[f][idx] != other.cols[f][idx] for f in self.FIELDS)]
+
+class dma_xfer:
+    # One contiguous transfer of a job, the scheduler splits it in descriptors
+    def __init__(self, src, dst, nbytes, wr_m=dma_mode.INCR, rd_m=dma_mode.INCR):
+        self.src    = src
+        self.dst    = dst
+        self.nbytes = nbytes
+        self.wr_m   = wr_m
+        self.rd_m   = rd_m
+
+    def split(self, max_bytes):
+        # Chunks of at most max_bytes, FIXED sides keep their address
+        chunks = []
+        off    = 0
+        while off < self.nbytes:
+            nbytes = min(max_bytes, self.nbytes-off)
+            src = self.src if self.rd_m == dma_mode.FIXED else self.src+off
+            dst = self.dst if self.wr_m == dma_mode.FIXED else self.dst+off
+            chunks.append(dma_xfer(src, dst, nbytes, self.wr_m, self.rd_m))
+            off += nbytes
+        return chunks
+
+    def __str__(self):
+        return f'DMA xfer: Src[{hex(self.src)}] Dst[{hex(self.dst)}] Size[{self.nbytes}] ' \
+               f'Write Mode[{self.wr_m}] Read Mode[{self.rd_m}]'
+
+def _dma_params(flavor):
+    params = dict(cfg_const.DMA_RTL_DEFAULTS)
+    if flavor is not None:
+        params.update(cfg_const._get_cfg(flavor))
+    return params
+
+def sg_merge(frags):
+    # (addr, len) fragments in order, the empty ones dropped and the ones
+    # that continue the previous fragment merged into it
+    merged = []
+    for addr, nbytes in frags:
+        if nbytes == 0:
+            continue
+        if merged and merged[-1][0]+merged[-1][1] == addr:
+            merged[-1][1] += nbytes
+        else:
+            merged.append([addr, nbytes])
+    return [(addr, nbytes) for addr, nbytes in merged]
+
+def sg_plan(src_frags, dst_frags, flavor=None, max_bytes=None):
+    """
+    Scatter-gather plan: the bytes of the src fragments, in order, go to
+    the dst fragments, in order. Returns the INCR dma_xfer list with the
+    fewest descriptors the contiguous runs allow, split where the
+    DMA_BYTES_WIDTH limit (or max_bytes) is hit. The cuts land on a full
+    burst (or 4KB) boundary of the source so the streamer keeps issuing
+    full bursts. The DMA does not realign, so every descriptor keeps
+    the same bus lane offset on both sides, and without
+    DMA_EN_UNALIGNED everything has to be bus aligned.
+    """
+    params = _dma_params(flavor)
+    bb     = params['axi_data_width']//8
+    limit  = ((1<<params['dma_bytes_width'])-1) & ~(bb-1)
+    limit  = limit if max_bytes is None else min(limit, max_bytes & ~(bb-1))
+    if limit < bb:
+        raise ValueError(f"Descriptor limit of {max_bytes}B is below one bus word ({bb}B)")
+    # Full bursts never cross a 4KB boundary, smaller limits fall back to a bus word
+    align = min(bb*params['dma_max_beat_burst'], 0x1000)
+    align = align if align <= limit else bb
+    src = sg_merge(src_frags)
+    dst = sg_merge(dst_frags)
+    if sum(n for _, n in src) != sum(n for _, n in dst):
+        raise ValueError(f"Scatter-gather size mismatch: {sum(n for _, n in src)}B src / "
+                         f"{sum(n for _, n in dst)}B dst")
+
+    xfers  = []
+    si, di = 0, 0
+    s_off, d_off = 0, 0
+    while si < len(src):
+        s = src[si][0]+s_off
+        d = dst[di][0]+d_off
+        n = min(src[si][1]-s_off, dst[di][1]-d_off)
+        if (s ^ d) & (bb-1):
+            raise ValueError(f"Src {hex(s)} and dst {hex(d)} are on different bus lanes, the DMA does not realign")
+        if not params['dma_en_unaligned'] and ((s | n) & (bb-1)):
+            raise ValueError(f"Unaligned segment src {hex(s)} {n}B without DMA_EN_UNALIGNED")
+        left = n
+        while left > limit:
+            cut = (((s+limit)//align)*align)-s
+            if cut <= 0:
+                cut = limit
+            xfers.append(dma_xfer(s, d, cut))
+            s, d, left = s+cut, d+cut, left-cut
+        xfers.append(dma_xfer(s, d, left))
+        s_off += n
+        d_off += n
+        if s_off == src[si][1]:
+            si, s_off = si+1, 0
+        if d_off == dst[di][1]:
+            di, d_off = di+1, 0
+    return xfers
+
+def sg_check(xfers, src_frags, dst_frags, flavor=None, max_bytes=None):
+    """
+    Proves a plan moves exactly the requested bytes: walked in order, the
+    src and dst sides of the xfers rebuild the merged fragment lists (no
+    gap, overlap, reorder or extra byte) and every descriptor fits the
+    limit with the same lane offset on both sides. Returns the problems.
+    """
+    params = _dma_params(flavor)
+    bb     = params['axi_data_width']//8
+    limit  = (1<<params['dma_bytes_width'])-1
+    limit  = limit if max_bytes is None else min(limit, max_bytes)
+    errors = []
+    for idx, xfer in enumerate(xfers):
+        if xfer.rd_m != dma_mode.INCR or xfer.wr_m != dma_mode.INCR:
+            errors.append(f"xfer {idx}: not INCR/INCR")
+        if not 0 < xfer.nbytes <= limit:
+            errors.append(f"xfer {idx}: {xfer.nbytes}B outside (0, {limit}]")
+        if (xfer.src ^ xfer.dst) & (bb-1):
+            errors.append(f"xfer {idx}: src {hex(xfer.src)} / dst {hex(xfer.dst)} on different lanes")
+    for side, frags in (('src', src_frags), ('dst', dst_frags)):
+        got = sg_merge([(getattr(xfer, side), xfer.nbytes) for xfer in xfers])
+        exp = sg_merge(frags)
+        if got != exp:
+            first = next((i for i, (g, e) in enumerate(zip(got, exp)) if g != e), min(len(got), len(exp)))
+            errors.append(f"{side} coverage differs at fragment {first}: "
+                          f"plan {got[first:first+1]} / requested {exp[first:first+1]}")
+    return errors
+
+def sg_rounds(xfers, num_desc=None):
+    # Descriptor tables of up to NUM_DESC entries, one DMA run each
+    num_desc = num_desc or cfg_const.NUM_DESC
+    rounds = []
+    for base in range(0, len(xfers), num_desc):
+        rounds.append([dma_desc(idx, x.src, x.dst, x.nbytes, x.wr_m, x.rd_m, 1)
+                       for idx, x in enumerate(xfers[base:base+num_desc])])
+    return rounds
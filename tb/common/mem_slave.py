@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : mem_slave.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import cocotb
+import random
+import logging
+from collections import deque
+from cocotb.triggers import RisingEdge
+from cocotbext.axi.memory import Memory
+from cocotbext.axi.reset import Reset
+from cocotbext.axi.constants import AxiBurstType, AxiResp
+from cocotbext.axi.axi_channels import AxiAWSink, AxiWSink, AxiBSource, AxiARSink, AxiRSource
+
+def _sampler(spec, rng):
+    # Latency as cycles: int, (min, max) uniform, [(cycles, weight), ...] or f(rng)
+    if callable(spec):
+        return lambda: int(spec(rng))
+    if isinstance(spec, int):
+        return lambda: spec
+    if isinstance(spec, tuple):
+        return lambda: rng.randint(*spec)
+    lats    = [lat for lat, _ in spec]
+    weights = [weight for _, weight in spec]
+    return lambda: rng.choices(lats, weights)[0]
+
+class mem_txn:
+    def __init__(self, seq, txn_id, addr, alen, size, burst, ready):
+        self.seq    = seq
+        self.txn_id = txn_id
+        self.addr   = addr
+        self.alen   = alen
+        self.size   = size
+        self.burst  = burst
+        self.ready  = ready # Cycle the response can start
+
+class axi_mem_slave(Memory):
+    """
+    AXI4 memory slave with a timing model, a drop-in for the AxiRam on
+    dma_m (same Memory API and write_if/read_if channels). Reads and
+    writes keep up to max_outstanding txns in service each, the data
+    (R beats) or response (B) waits the sampled latency, beats of both
+    directions share a bytes_per_cycle budget and responses are returned
+    following the order policy:
+    - in_order: in the order the addresses were accepted
+    - per_id:   in order within an ID, the first ready across IDs
+    - random:   any ready ID, in order within it
+    """
+    def __init__(self, bus, clock, reset=None, reset_active_level=True, size=2**64, mem=None,
+                 rd_latency=1, wr_latency=1, max_outstanding=8, bytes_per_cycle=None,
+                 order='in_order', seed=None, **kwargs):
+        super().__init__(size, mem, **kwargs)
+        if order not in ('in_order', 'per_id', 'random'):
+            raise ValueError(f"Unknown order policy {order}")
+        self.clock           = clock
+        self.rng             = random.Random(seed if seed is not None else random.getrandbits(32))
+        self.rd_latency      = _sampler(rd_latency, self.rng)
+        self.wr_latency      = _sampler(wr_latency, self.rng)
+        self.max_outstanding = max_outstanding
+        self.bytes_per_cycle = bytes_per_cycle
+        self.order           = order
+        self.cycle           = 0
+        self._tokens         = 0.0
+        self._seq            = 0
+        self.write_if = axi_mem_write(self, bus.write, clock, reset, reset_active_level)
+        self.read_if  = axi_mem_read(self, bus.read, clock, reset, reset_active_level)
+        cocotb.start_soon(self._tick())
+
+    async def _tick(self):
+        # Cycle count and the bandwidth bucket, one beat of burst allowed
+        edge = RisingEdge(self.clock)
+        while True:
+            await edge
+            self.cycle += 1
+            if self.bytes_per_cycle is not None:
+                cap = max(self.bytes_per_cycle, self.read_if.byte_lanes)
+                self._tokens = min(self._tokens+self.bytes_per_cycle, cap)
+
+    async def _take(self, nbytes):
+        if self.bytes_per_cycle is None:
+            return
+        edge = RisingEdge(self.clock)
+        while self._tokens < nbytes:
+            await edge
+        self._tokens -= nbytes
+
+    def _push(self, pend, txn_id, addr, alen, size, burst, ready):
+        self._seq += 1
+        key = None if self.order == 'in_order' else txn_id
+        pend.setdefault(key, deque()).append(mem_txn(self._seq, txn_id, addr, alen, size, burst, ready))
+
+    def _pick(self, pend):
+        heads = [q for q in pend.values() if q and q[0].ready <= self.cycle]
+        if len(heads) == 0:
+            return None
+        if self.order == 'random':
+            return self.rng.choice(heads).popleft()
+        return min(heads, key=lambda q: (q[0].ready, q[0].seq)).popleft()
+
+    def report(self):
+        return {'rd_outstanding': self.read_if.outstanding, 'wr_outstanding': self.write_if.outstanding,
+                'max_rd_outstanding': self.read_if.max_seen, 'max_wr_outstanding': self.write_if.max_seen}
+
+class _mem_if(Reset):
+    def __init__(self, parent, name, clock, reset, reset_active_level):
+        super().__init__()
+        self.parent      = parent
+        self.clock       = clock
+        self.log         = logging.getLogger(f"cocotb.axi_mem_slave.{name}")
+        self.outstanding = 0
+        self.max_seen    = 0
+        self._pend       = {}
+        self._crs        = []
+
+    def _handle_reset(self, state):
+        if state:
+            for cr in self._crs:
+                cr.kill()
+            self._crs = []
+            for channel in self._channels():
+                channel.clear()
+            self._pend.clear()
+            self.outstanding = 0
+        elif len(self._crs) == 0:
+            self._crs = [cocotb.start_soon(self._accept()), cocotb.start_soon(self._respond())]
+
+    async def _wait_slot(self):
+        edge = RisingEdge(self.clock)
+        while self.outstanding >= self.parent.max_outstanding:
+            await edge
+
+    def _issued(self):
+        self.outstanding += 1
+        self.max_seen = max(self.max_seen, self.outstanding)
+
+class axi_mem_read(_mem_if):
+    def __init__(self, parent, bus, clock, reset=None, reset_active_level=True):
+        super().__init__(parent, "read", clock, reset, reset_active_level)
+        self.ar_channel = AxiARSink(bus.ar, clock, reset, reset_active_level)
+        self.ar_channel.queue_occupancy_limit = 1
+        self.r_channel  = AxiRSource(bus.r, clock, reset, reset_active_level)
+        self.r_channel.queue_occupancy_limit = 2
+        self.byte_lanes = len(self.r_channel.bus.rdata)//8
+        self._init_reset(reset, reset_active_level)
+
+    def _channels(self):
+        return (self.ar_channel, self.r_channel)
+
+    async def _accept(self):
+        p = self.parent
+        while True:
+            await self._wait_slot()
+            ar = await self.ar_channel.recv()
+            self._issued()
+            p._push(self._pend, int(getattr(ar, 'arid', 0)), int(ar.araddr), int(getattr(ar, 'arlen', 0)),
+                    int(ar.arsize), int(getattr(ar, 'arburst', AxiBurstType.INCR)), p.cycle+p.rd_latency())
+
+    async def _respond(self):
+        p     = self.parent
+        lanes = self.byte_lanes
+        edge  = RisingEdge(self.clock)
+        while True:
+            txn = p._pick(self._pend)
+            if txn is None:
+                await edge
+                continue
+            addr = txn.addr
+            for n in range(txn.alen+1):
+                await p._take(lanes)
+                word = (addr//lanes)*lanes
+                r = self.r_channel._transaction_obj()
+                r.rid   = txn.txn_id
+                r.rdata = int.from_bytes(p.read(word, lanes), 'little')
+                r.rresp = AxiResp.OKAY
+                r.rlast = n == txn.alen
+                await self.r_channel.send(r)
+                if txn.burst != AxiBurstType.FIXED:
+                    addr += 2**txn.size
+            self.outstanding -= 1
+
+class axi_mem_write(_mem_if):
+    def __init__(self, parent, bus, clock, reset=None, reset_active_level=True):
+        super().__init__(parent, "write", clock, reset, reset_active_level)
+        self.aw_channel = AxiAWSink(bus.aw, clock, reset, reset_active_level)
+        self.aw_channel.queue_occupancy_limit = 1
+        self.w_channel  = AxiWSink(bus.w, clock, reset, reset_active_level)
+        self.w_channel.queue_occupancy_limit = 1 # Keeps WREADY close to the bandwidth budget
+        self.b_channel  = AxiBSource(bus.b, clock, reset, reset_active_level)
+        self.b_channel.queue_occupancy_limit = 2
+        self.byte_lanes = len(self.w_channel.bus.wdata)//8
+        self._init_reset(reset, reset_active_level)
+
+    def _channels(self):
+        return (self.aw_channel, self.w_channel, self.b_channel)
+
+    async def _accept(self):
+        # W beats follow the AW order, the latency counts from the last one
+        p     = self.parent
+        lanes = self.byte_lanes
+        while True:
+            await self._wait_slot()
+            aw = await self.aw_channel.recv()
+            self._issued()
+            addr  = int(aw.awaddr)
+            alen  = int(getattr(aw, 'awlen', 0))
+            size  = int(aw.awsize)
+            burst = int(getattr(aw, 'awburst', AxiBurstType.INCR))
+            cur   = addr
+            for n in range(alen+1):
+                await p._take(lanes)
+                w    = await self.w_channel.recv()
+                data = int(w.wdata).to_bytes(lanes, 'little')
+                strb = int(w.wstrb)
+                word = (cur//lanes)*lanes
+                if strb == (1<<lanes)-1:
+                    p.write(word, data)
+                else:
+                    for lane in range(lanes):
+                        if (strb>>lane) & 1:
+                            p.write(word+lane, data[lane:lane+1])
+                if burst != AxiBurstType.FIXED:
+                    cur += 2**size
+            p._push(self._pend, int(getattr(aw, 'awid', 0)), addr, alen, size, burst, p.cycle+p.wr_latency())
+
+    async def _respond(self):
+        p    = self.parent
+        edge = RisingEdge(self.clock)
+        while True:
+            txn = p._pick(self._pend)
+            if txn is None:
+                await edge
+                continue
+            b = self.b_channel._transaction_obj()
+            b.bid   = txn.txn_id
+            b.bresp = AxiResp.OKAY
+            await self.b_channel.send(b)
+            self.outstanding -= 1
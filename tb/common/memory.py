@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : memory.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import os
+import sys
+import mmap
+import random
+import shutil
+from cocotbext.axi.sparse_memory import SparseMemory
+from common.constants import cfg_const
+
+class paged_memory(SparseMemory):
+    """
+    The cocotbext-axi SparseMemory (4KB blocks allocated on the first
+    write, unwritten ones read as 0) with what it lacks for the tb: with a
+    path the blocks live in a file mapped in chunks (arenas) the kernel can
+    page out, and report() for the footprint.
+    """
+    def __init__(self, size=2**32, path=None, arena_pages=4096):
+        super().__init__(size)
+        self.page_size = 4096 # SparseMemory block size
+        self.path      = path
+        self._arena_sz = arena_pages*self.page_size
+        self._arenas   = []
+        self._slots    = 0
+        self._file     = None
+        if path is not None:
+            self._file = open(path, 'w+b')
+
+    def _new_page(self):
+        arena, slot = divmod(self._slots, self._arena_sz//self.page_size)
+        if slot == 0:
+            # The file is sparse, growing it does not touch the disk
+            self._file.truncate((arena+1)*self._arena_sz)
+            self._arenas.append(mmap.mmap(self._file.fileno(), self._arena_sz,
+                                          offset=arena*self._arena_sz))
+        self._slots += 1
+        start = slot*self.page_size
+        return memoryview(self._arenas[arena])[start:start+self.page_size]
+
+    def write(self, address, data, **kwargs):
+        if self._file is not None and len(data) > 0:
+            # Blocks taken from the file before SparseMemory allocates them
+            ps = self.page_size
+            for block in range(address & ~(ps-1), address+len(data), ps):
+                if block not in self.segs and 0 <= block < self.size:
+                    self.segs[block] = self._new_page()
+        super().write(address, data, **kwargs)
+
+    def clear(self):
+        super().clear()
+        self._slots = 0
+        for arena in self._arenas:
+            arena.close()
+        self._arenas = []
+        if self._file is not None:
+            self._file.truncate(0)
+
+    def close(self):
+        self.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self.path)
+
+    @property
+    def resident(self):
+        # Bytes allocated for blocks, mapped file pages included
+        return len(self.segs)*self.page_size
+
+    def report(self):
+        blocks = sorted(self.segs)
+        return {'pages': len(blocks), 'page_size': self.page_size,
+                'resident_bytes': self.resident,
+                'file_bytes': len(self._arenas)*self._arena_sz,
+                'lowest_addr': blocks[0] if blocks else None,
+                'highest_addr': blocks[-1]+self.page_size-1 if blocks else None,
+                'span_bytes': self.size}
+
+    def __str__(self):
+        return (f'Paged memory: {len(self.segs)} x {self.page_size}B pages, '
+                f'{self.resident/1024:.1f}KB resident out of {self.size/(1024*1024):.0f}MB '
+                f'({"file "+self.path if self.path else "anonymous"})')
+
+    def __len__(self):
+        # len() is capped at sys.maxsize, enough for any 64-bit address used in the tb
+        return min(self.size, sys.maxsize)
+
+class mmap_memory:
+    """
+    AxiRam store mapped from an image file. Private mappings are copy on
+    write, the file is never modified and only the pages written by the
+    DMA/tb get copied. Those are tracked so snapshots only save them and
+    restore drops everything by mapping the file again.
+    """
+    def __init__(self, path, size=None, private=True, page_size=4096):
+        if size is None:
+            size = os.path.getsize(path)
+        self.path      = path
+        self.size      = size
+        self.private   = private
+        self.page_size = page_size
+        self._shift    = page_size.bit_length()-1
+        if private:
+            if os.path.getsize(path) < size:
+                raise ValueError(f"Image {path} is smaller than {size}B")
+            self._fd = os.open(path, os.O_RDONLY)
+        else:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT)
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        self.mm = None
+        self._map()
+
+    def _map(self):
+        old = self.mm
+        if self.private:
+            self.mm = mmap.mmap(self._fd, self.size, flags=mmap.MAP_PRIVATE,
+                                prot=mmap.PROT_READ | mmap.PROT_WRITE)
+        else:
+            self.mm = mmap.mmap(self._fd, self.size)
+        self.dirty = set()
+        if old is not None:
+            try:
+                old.close()
+            except BufferError:
+                pass # Still viewed somewhere, released with the last view
+
+    def read(self, address, length):
+        return self.mm[address:address+length]
+
+    def write(self, address, data):
+        data = memoryview(data).cast('B')
+        if len(data) == 0:
+            return
+        self.mm[address:address+len(data)] = data
+        self.dirty.update(range(address >> self._shift, ((address+len(data)-1) >> self._shift)+1))
+
+    def view(self, address, length):
+        # Zero-copy, invalid after restore()
+        return memoryview(self.mm)[address:address+length]
+
+    def snapshot(self):
+        # Copies the pages that differ from the image, not the whole memory
+        ps = self.page_size
+        return {page: self.mm[page*ps:(page+1)*ps] for page in self.dirty}
+
+    def restore(self, snap=None):
+        if not self.private:
+            raise ValueError("Snapshots need a private (copy on write) mapping")
+        self._map()
+        if snap:
+            ps = self.page_size
+            for page, data in snap.items():
+                self.mm[page*ps:page*ps+len(data)] = data
+            self.dirty = set(snap)
+
+    def save(self, path):
+        # Writes the current content as a new image, only dirty pages are copied from memory
+        if os.path.abspath(path) != os.path.abspath(self.path):
+            shutil.copyfile(self.path, path)
+        with open(path, 'r+b') as f:
+            f.truncate(self.size)
+            ps = self.page_size
+            for page in sorted(self.dirty):
+                f.seek(page*ps)
+                f.write(self.mm[page*ps:(page+1)*ps])
+        return path
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        self.mm.close()
+        os.close(self._fd)
+
+    @property
+    def resident(self):
+        # Private pages only, the clean ones are shared with the page cache
+        return len(self.dirty)*self.page_size
+
+    def report(self):
+        return {'pages': len(self.dirty), 'page_size': self.page_size,
+                'resident_bytes': self.resident, 'file_bytes': self.size,
+                'span_bytes': self.size}
+
+    def __str__(self):
+        return (f'Mmap memory: {self.path} ({self.size/1024:.0f}KB), '
+                f'{len(self.dirty)} x {self.page_size}B pages written')
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, key):
+        return self.mm[key]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, int):
+            return self.write(key, bytes([value]))
+        start, stop, step = key.indices(self.size)
+        if step != 1:
+            raise IndexError("Step size is not supported")
+        value = bytes(value)
+        if stop-start != len(value):
+            raise IndexError("Slice assignment is wrong size")
+        self.write(start, value)
+
+def build_image(size, seed=None, fill=None, name=None):
+    """
+    Creates a memory image once in run_dir/images (random bytes from seed
+    or fill(file)), keyed by size and seed so later runs, the other test
+    variants and the regression jobs reuse the same file. Writers go
+    through a temporary file and a rename, so concurrent builds of the
+    same (deterministic) image need no lock.
+    """
+    name = name or f"ram_{size}_{seed}"
+    path = os.path.join(cfg_const.RUN_DIR, "images", f"{name}.img")
+    if os.path.isfile(path) and os.path.getsize(path) == size:
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        if fill is not None:
+            fill(f)
+        else:
+            rnd = random.Random(seed)
+            left = size
+            while left > 0:
+                n = min(left, 1 << 20)
+                f.write(rnd.randbytes(n))
+                left -= n
+        f.truncate(size)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : monitor.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import cocotb
+import json
+import logging
+from collections import deque
+from cocotb.triggers import RisingEdge, Edge
+from cocotb.utils import get_sim_time
+
+class axi_burst:
+    def __init__(self, kind, txn_id, addr, alen, size, issue):
+        self.kind   = kind # 'rd' or 'wr'
+        self.txn_id = txn_id
+        self.addr   = addr
+        self.alen   = alen
+        self.size   = size
+        self.issue  = issue # AR/AW handshake cycle
+        self.first  = None  # First data beat cycle
+        self.last   = None  # Last data beat cycle
+        self.resp   = None  # B handshake cycle (writes only)
+        self.burst  = None  # AxBURST
+        self.data   = []    # [(wdata, wstrb)] per beat when capturing
+
+    @property
+    def nbytes(self):
+        return (self.alen+1)*(2**self.size)
+
+    def to_dict(self):
+        return {'kind': self.kind, 'id': self.txn_id, 'addr': self.addr,
+                'alen': self.alen, 'size': self.size, 'issue': self.issue,
+                'first': self.first, 'last': self.last, 'resp': self.resp}
+
+def _stats(values):
+    if len(values) == 0:
+        return {'min': 0, 'avg': 0.0, 'max': 0}
+    return {'min': min(values), 'avg': sum(values)/len(values), 'max': max(values)}
+
+class axi_perf_report:
+    def __init__(self, bursts, start, end, rd_beats, wr_beats, r2w, depth, clk_period_ns=None):
+        self.bursts        = bursts
+        self.start         = start
+        self.end           = end
+        self.cycles        = max(end-start, 1)
+        self.rd_bursts     = [b for b in bursts if b.kind == 'rd']
+        self.wr_bursts     = [b for b in bursts if b.kind == 'wr']
+        self.rd_bytes      = sum(b.nbytes for b in self.rd_bursts)
+        self.wr_bytes      = sum(b.nbytes for b in self.wr_bursts)
+        self.bytes_cycle   = self.wr_bytes/self.cycles
+        self.rd_util       = rd_beats/self.cycles
+        self.wr_util       = wr_beats/self.cycles
+        self.rd_latency    = _stats([b.first-b.issue for b in self.rd_bursts if b.first is not None])
+        self.wr_latency    = _stats([b.resp-b.issue for b in self.wr_bursts if b.resp is not None])
+        self.r2w_latency   = _stats(r2w)
+        self.depth         = depth # [(cycle, rd_outstanding, wr_outstanding)]
+        self.max_rd_ot     = max((d[1] for d in depth), default=0)
+        self.max_wr_ot     = max((d[2] for d in depth), default=0)
+        self.avg_rd_ot     = self._avg_depth(1)
+        self.avg_wr_ot     = self._avg_depth(2)
+        self.clk_period_ns = clk_period_ns
+
+    def _avg_depth(self, idx):
+        # Time weighted average of the outstanding txns
+        acc = 0
+        for cur, nxt in zip(self.depth, self.depth[1:]+[(self.end, 0, 0)]):
+            acc += cur[idx]*(nxt[0]-cur[0])
+        return acc/self.cycles
+
+    @property
+    def mib_s(self):
+        if self.clk_period_ns is None:
+            return None
+        return (self.wr_bytes/(1024*1024))/(self.cycles*self.clk_period_ns*(10**-9))
+
+    def to_dict(self, with_bursts=True):
+        ret = {'cycles': self.cycles, 'rd_bytes': self.rd_bytes, 'wr_bytes': self.wr_bytes,
+               'rd_bursts': len(self.rd_bursts), 'wr_bursts': len(self.wr_bursts),
+               'bytes_per_cycle': self.bytes_cycle, 'mib_s': self.mib_s,
+               'rd_utilisation': self.rd_util, 'wr_utilisation': self.wr_util,
+               'rd_latency': self.rd_latency, 'wr_latency': self.wr_latency,
+               'rd_to_wr_latency': self.r2w_latency,
+               'max_rd_outstanding': self.max_rd_ot, 'max_wr_outstanding': self.max_wr_ot,
+               'avg_rd_outstanding': self.avg_rd_ot, 'avg_wr_outstanding': self.avg_wr_ot,
+               'outstanding': self.depth}
+        if with_bursts:
+            ret['bursts'] = [b.to_dict() for b in self.bursts]
+        return ret
+
+    def to_json(self, path, with_bursts=True):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(with_bursts), f, indent=2)
+
+    def __str__(self):
+        return (f'AXI perf: {self.cycles} cycles, {self.wr_bytes}B written, '
+                f'{self.bytes_cycle:.3f} B/cycle, util rd/wr {self.rd_util:.2%}/{self.wr_util:.2%}, '
+                f'max outstanding rd/wr {self.max_rd_ot}/{self.max_wr_ot}, '
+                f'rd->wr latency avg {self.r2w_latency["avg"]:.1f} cycles')
+
+class axi_monitor:
+    """
+    Passive monitor of an AXI4 master port, it only samples the handshakes
+    and never drives anything so it can sit on any bus of the DUT. The
+    callbacks get every burst once its data phase is over, capture keeps
+    the write data beats for them.
+    """
+    def __init__(self, dut, prefix, clk, rst=None, capture=False):
+        self.log   = logging.getLogger(f"cocotb.axi_monitor.{prefix}")
+        self.clk   = clk
+        self.rst   = rst
+        self.capture   = capture
+        self.callbacks = []
+        self._sig  = {}
+        for name in ['arvalid','arready','arid','araddr','arlen','arsize','arburst',
+                     'rvalid','rready','rid','rlast',
+                     'awvalid','awready','awid','awaddr','awlen','awsize','awburst',
+                     'wvalid','wready','wlast','wdata','wstrb',
+                     'bvalid','bready','bid']:
+            self._sig[name] = getattr(dut, f"{prefix}_{name}")
+        self._cr   = None
+        self.clear()
+
+    def clear(self):
+        self.cycle     = 0
+        self._start    = None
+        self._end      = 0
+        self._bursts   = []
+        self._rd_pend  = {}      # id -> deque of bursts waiting R data
+        self._wr_data  = deque() # bursts waiting W data (in order)
+        self._wr_resp  = {}      # id -> deque of bursts waiting B
+        self._r_times  = deque() # R beat cycles waiting the matching W beat
+        self._r2w      = []
+        self._rd_beats = 0
+        self._wr_beats = 0
+        self._rd_ot    = 0
+        self._wr_ot    = 0
+        self._depth    = []
+
+    def start(self):
+        if self._cr is None:
+            self._cr = cocotb.start_soon(self._run())
+
+    def stop(self):
+        if self._cr is not None:
+            self._cr.kill()
+            self._cr = None
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def _done(self, burst):
+        for callback in self.callbacks:
+            callback(burst)
+
+    def report(self, clk_period_ns=None):
+        start = self._start if self._start is not None else 0
+        return axi_perf_report(list(self._bursts), start, self._end, self._rd_beats,
+                               self._wr_beats, list(self._r2w), list(self._depth), clk_period_ns)
+
+    def _hs(self, valid, ready):
+        return self._sig[valid].value == 1 and self._sig[ready].value == 1
+
+    def _mark(self):
+        self._end = self.cycle
+        if self._start is None:
+            self._start = self.cycle
+
+    async def _run(self):
+        edge = RisingEdge(self.clk)
+        sig  = self._sig
+        while True:
+            await edge
+            self.cycle += 1
+            if self.rst is not None and self.rst.value == 1:
+                continue
+            rd_ot, wr_ot = self._rd_ot, self._wr_ot
+
+            if self._hs('arvalid','arready'):
+                burst = axi_burst('rd', int(sig['arid'].value), int(sig['araddr'].value),
+                                  int(sig['arlen'].value), int(sig['arsize'].value), self.cycle)
+                burst.burst = int(sig['arburst'].value)
+                self._bursts.append(burst)
+                self._rd_pend.setdefault(burst.txn_id, deque()).append(burst)
+                self._rd_ot += 1
+                self._mark()
+
+            if self._hs('rvalid','rready'):
+                pend = self._rd_pend.get(int(sig['rid'].value))
+                self._rd_beats += 1
+                self._r_times.append(self.cycle)
+                if pend:
+                    burst = pend[0]
+                    if burst.first is None:
+                        burst.first = self.cycle
+                    if sig['rlast'].value == 1:
+                        burst.last = self.cycle
+                        pend.popleft()
+                        self._rd_ot -= 1
+                        self._done(burst)
+                self._mark()
+
+            if self._hs('awvalid','awready'):
+                burst = axi_burst('wr', int(sig['awid'].value), int(sig['awaddr'].value),
+                                  int(sig['awlen'].value), int(sig['awsize'].value), self.cycle)
+                burst.burst = int(sig['awburst'].value)
+                self._bursts.append(burst)
+                self._wr_data.append(burst)
+                self._wr_resp.setdefault(burst.txn_id, deque()).append(burst)
+                self._wr_ot += 1
+                self._mark()
+
+            if self._hs('wvalid','wready'):
+                self._wr_beats += 1
+                if self._r_times:
+                    self._r2w.append(self.cycle-self._r_times.popleft())
+                if self._wr_data:
+                    burst = self._wr_data[0]
+                    if burst.first is None:
+                        burst.first = self.cycle
+                    if self.capture:
+                        burst.data.append((int(sig['wdata'].value), int(sig['wstrb'].value)))
+                    if sig['wlast'].value == 1:
+                        burst.last = self.cycle
+                        self._wr_data.popleft()
+                        self._done(burst)
+                self._mark()
+
+            if self._hs('bvalid','bready'):
+                pend = self._wr_resp.get(int(sig['bid'].value))
+                if pend:
+                    pend.popleft().resp = self.cycle
+                    self._wr_ot -= 1
+                self._mark()
+
+            if (rd_ot, wr_ot) != (self._rd_ot, self._wr_ot):
+                self._depth.append((self.cycle, self._rd_ot, self._wr_ot))
+
+class occupancy_monitor:
+    """
+    Time weighted histograms of internal levels (FIFO occupancy, pending
+    txn counters). Each signal is only woken up when its value changes so
+    it costs nothing while the level holds, the time spent at a level is
+    added when it leaves it.
+    """
+    def __init__(self, signals, clk_period_ns):
+        self.log     = logging.getLogger("cocotb.occupancy_monitor")
+        self.signals = signals # name -> (handle, capacity)
+        self.period  = clk_period_ns
+        self._crs    = []
+        self.clear()
+
+    def clear(self):
+        now = get_sim_time(units='ns')
+        self._t0   = now
+        self._hist = {name: {} for name in self.signals}
+        self._last = {name: (now, self._level(handle)) for name, (handle, _) in self.signals.items()}
+
+    def _level(self, handle):
+        value = handle.value
+        return int(value) if value.is_resolvable else None
+
+    def _account(self, name, now, level):
+        since, last = self._last[name]
+        if last is not None and now > since:
+            hist = self._hist[name]
+            hist[last] = hist.get(last, 0)+(now-since)
+        self._last[name] = (now, level)
+
+    def start(self):
+        if len(self._crs) == 0:
+            self._crs = [cocotb.start_soon(self._watch(name)) for name in self.signals]
+
+    def stop(self):
+        for cr in self._crs:
+            cr.kill()
+        self._crs = []
+
+    async def _watch(self, name):
+        handle = self.signals[name][0]
+        edge   = Edge(handle)
+        while True:
+            await edge
+            self._account(name, get_sim_time(units='ns'), self._level(handle))
+
+    def report(self):
+        # Closes the open intervals, levels in cycles
+        now = get_sim_time(units='ns')
+        ret = {}
+        for name, (handle, capacity) in self.signals.items():
+            self._account(name, now, self._last[name][1])
+            hist  = {level: t/self.period for level, t in sorted(self._hist[name].items())}
+            total = sum(hist.values())
+            if total == 0:
+                ret[name] = {'capacity': capacity, 'cycles': 0, 'histogram': {}}
+                continue
+            ret[name] = {'capacity': capacity, 'cycles': total,
+                         'avg': sum(level*t for level, t in hist.items())/total,
+                         'max': max(hist),
+                         'full_pct': 100*sum(t for level, t in hist.items() if level >= capacity)/total,
+                         'empty_pct': 100*hist.get(0, 0)/total,
+                         'histogram': hist}
+        return ret
+
+    def summary(self, report=None):
+        report = report if report is not None else self.report()
+        return ", ".join(f"{name} avg {r['avg']:.2f}/{r['capacity']} full {r['full_pct']:.1f}% "
+                         f"empty {r['empty_pct']:.1f}%" for name, r in report.items() if r['cycles'])
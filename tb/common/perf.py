@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : perf.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import os
+import csv
+import json
+import fcntl
+from common.constants import cfg_const
+
+BASELINE_VERSION = 2 # 2: mib_s over the dma_m bus window
+BASELINE_FILE    = os.path.join(cfg_const.TESTS_DIR,"../perf_baseline.json")
+RESULTS_FILE     = "perf_results.json"
+
+def save_results(results, path=RESULTS_FILE):
+    # Called from the simulation side, cwd is the run dir of the test
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def load_results(work_dir, name=RESULTS_FILE):
+    with open(os.path.join(work_dir, name)) as f:
+        return json.load(f)
+
+def _load_baseline(f):
+    f.seek(0)
+    content = f.read()
+    if content.strip() == "":
+        return {'version': BASELINE_VERSION, 'flavors': {}}
+    baseline = json.loads(content)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"Unsupported perf baseline version {baseline.get('version')}")
+    return baseline
+
+def check_baseline(flavor, results, threshold=None, update=None, path=BASELINE_FILE):
+    """
+    Compares the MiB/s of every point against the stored baseline and
+    returns (regressions beyond the threshold, points with no baseline).
+    Missing points are never recorded on their own, only DMA_PERF_UPDATE=1
+    stores the results (all of them) as the new baseline.
+    """
+    if threshold is None:
+        threshold = float(os.getenv("DMA_PERF_THRESHOLD", cfg_const.PERF_THRESHOLD))
+    if update is None:
+        update = os.getenv("DMA_PERF_UPDATE") == "1"
+
+    regressions = []
+    missing     = []
+    with open(path, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            baseline = _load_baseline(f)
+            ref = baseline['flavors'].setdefault(flavor, {}) if update else baseline['flavors'].get(flavor, {})
+            changed = False
+            for point, res in results.items():
+                if update:
+                    ref[point] = res
+                    changed = True
+                    continue
+                if point not in ref:
+                    missing.append(point)
+                    continue
+                exp = ref[point]['mib_s']
+                if res['mib_s'] < exp*(1-threshold):
+                    regressions.append(f"{flavor}/{point}: {res['mib_s']:.2f} MiB/s "
+                                       f"< baseline {exp:.2f} MiB/s (-{(1-res['mib_s']/exp):.1%})")
+            if changed:
+                f.seek(0)
+                f.truncate()
+                json.dump(baseline, f, indent=2, sort_keys=True)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    return regressions, missing
+
+def update_table(path, key, rows, csv_path=None):
+    """
+    Stores the rows of one flavor (key) in a JSON table shared by all the
+    workers of a benchmark, the other keys are kept. The csv_path copy is
+    written under the same lock.
+    """
+    with open(path, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            content = f.read()
+            table = json.loads(content) if content.strip() != "" else {}
+            table[key] = rows
+            f.seek(0)
+            f.truncate()
+            json.dump(table, f, indent=2, sort_keys=True)
+            f.flush()
+            if csv_path is not None:
+                write_csv(csv_path, table)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    return table
+
+def write_csv(path, table):
+    # Flat view of a {key: {point: {metric: value}}} table, one row per point
+    fields = sorted({metric for rows in table.values() for res in rows.values() for metric in res})
+    tmp = f"{path}.{os.getpid()}"
+    with open(tmp, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['flavor', 'point']+fields)
+        for key in sorted(table):
+            for point in sorted(table[key]):
+                writer.writerow([key, point]+[table[key][point].get(metric, '') for metric in fields])
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : ref_model.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import logging
+from common.constants import cfg_const
+from common.dma import dma_mode
+
+AXI_FIXED = 0
+AXI_INCR  = 1
+
+class ref_burst:
+    def __init__(self, kind, desc_id, addr, alen, size, burst, strb):
+        self.kind    = kind # 'rd' or 'wr'
+        self.desc_id = desc_id
+        self.addr    = addr
+        self.alen    = alen
+        self.size    = size
+        self.burst   = burst
+        self.strb    = strb # Same strobe in every beat of the burst
+
+    @property
+    def beats(self):
+        return self.alen+1
+
+    def __str__(self):
+        return (f'{self.kind} desc[{self.desc_id}] addr[{hex(self.addr)}] alen[{self.alen}] '
+                f'size[{self.size}] burst[{self.burst}] strb[{bin(self.strb)}]')
+
+class dma_ref_model:
+    """
+    Golden model of the DMA streamers, mirrors dma_streamer.sv burst by
+    burst (quirks included) and pairs read/write beats the same way the
+    DMA FIFO does. Everything is a generator so huge transfers never get
+    expanded in memory. Src and dst regions are expected not to overlap.
+    """
+    def __init__(self, descriptors, bb, max_burst=255, flavor=None, **kwargs):
+        params = dict(cfg_const.DMA_RTL_DEFAULTS)
+        if flavor is not None:
+            params.update(cfg_const._get_cfg(flavor))
+        params.update(kwargs)
+        self.bb           = bb
+        self.size         = bb.bit_length()-1
+        self.full_strb    = (1<<bb)-1
+        self.maxb         = max_burst & 0xFF
+        self.max_beats    = params['dma_max_beat_burst']
+        self.en_unaligned = params['dma_en_unaligned']
+        self.max_burst_en = params['dma_max_burst_en']
+        self.addr_mask    = (1<<params['axi_addr_width'])-1
+        self.bytes_mask   = (1<<params['dma_bytes_width'])-1
+        # The FSM walks the enabled descriptors with bytes in index order
+        descs = {}
+        for desc in descriptors:
+            descs[desc.desc_id] = desc
+        self.descs = [descs[i] for i in sorted(descs) if descs[i].en and descs[i].nbytes != 0]
+        self.log = logging.getLogger("cocotb.dma_ref_model")
+
+    def _strb(self, offset, nbytes):
+        # get_strb(), the case only covers 1..4 (32b) / 1..7 (64b) bytes and
+        # the shift uses addr[2:0] even on a 32b bus
+        if not (1 <= nbytes <= (4 if self.bb == 4 else 7)):
+            return 0
+        strb = (1<<nbytes)-1
+        if self.en_unaligned:
+            strb <<= (offset & 0x7)
+        return strb & self.full_strb
+
+    def _great_alen(self, addr, nbytes, mode):
+        beats = min(self.max_beats, nbytes//self.bb)
+        if self.max_burst_en:
+            beats = min(beats, self.maxb+1)
+        if self.max_beats > 16 and mode == dma_mode.FIXED:
+            beats = min(beats, 16)
+        # burst_r4KB(), ending exactly at the boundary is allowed
+        beats = min(beats, (0x1000-(addr & 0xFFF))//self.bb)
+        if addr+(beats*self.bb) > self.addr_mask:
+            beats -= 1
+        return max(beats, 1)-1
+
+    def _stream(self, kind, desc):
+        if kind == 'rd':
+            addr, mode = desc.src, desc.rd_m
+        else:
+            addr, mode = desc.dst, desc.wr_m
+        bb     = self.bb
+        nbytes = desc.nbytes & self.bytes_mask
+        burst  = AXI_FIXED if mode == dma_mode.FIXED else AXI_INCR
+        while nbytes > 0:
+            offset = addr & (bb-1)
+            if offset == 0 and nbytes >= bb:
+                alen  = self._great_alen(addr, nbytes, mode)
+                strb  = self.full_strb
+                txn   = (alen+1)*bb
+            else:
+                alen = 0
+                if self.en_unaligned:
+                    if nbytes >= bb: # Beginning unaligned
+                        txn  = bb-offset
+                        strb = self._strb(addr, txn)
+                    elif offset == 0: # End of the descriptor
+                        txn  = nbytes & 0xF
+                        strb = self._strb(0, txn)
+                    else: # Small descriptor
+                        txn  = nbytes & 0xF
+                        strb = self._strb(addr, txn)
+                else:
+                    txn  = nbytes & 0xF
+                    strb = self._strb(0, txn)
+                if txn == 0:
+                    raise ValueError(f"Descriptor {desc.desc_id} stalls the DMA at {hex(addr)} ({nbytes}B left)")
+            yield ref_burst(kind, desc.desc_id, addr & ~(bb-1), alen, self.size, burst, strb)
+            nbytes -= txn
+            if mode != dma_mode.FIXED:
+                addr = (addr+txn) & self.addr_mask
+
+    def bursts(self, kind):
+        # Expected AR ('rd') or AW ('wr') sequence
+        for desc in self.descs:
+            yield from self._stream(kind, desc)
+
+    def _mask(self, data, strb):
+        if strb == self.full_strb:
+            return data
+        out = bytearray(len(data))
+        for lane in range(self.bb):
+            if (strb>>lane) & 1:
+                out[lane::self.bb] = data[lane::self.bb]
+        return bytes(out)
+
+    def _rd_data(self, read):
+        # Beats pushed in the DMA FIFO, rdata with the read strobe applied
+        bb = self.bb
+        for b in self.bursts('rd'):
+            if b.burst == AXI_FIXED:
+                yield self._mask(bytes(read(b.addr, bb)), b.strb)*b.beats
+            else:
+                yield self._mask(bytes(read(b.addr, b.beats*bb)), b.strb)
+
+    def write_beats(self, read):
+        """
+        Yields (write burst, wdata of all its beats) where read(addr, n)
+        returns the source memory, write beats pop the FIFO in order.
+        """
+        rd  = self._rd_data(read)
+        buf = bytearray()
+        for b in self.bursts('wr'):
+            need = b.beats*self.bb
+            while len(buf) < need:
+                chunk = next(rd, None)
+                if chunk is None:
+                    raise ValueError(f"Write burst without read data in the FIFO: {b}")
+                buf += chunk
+            data = bytes(buf[:need])
+            del buf[:need]
+            yield b, data
+
+    def image(self, read):
+        """
+        Expected memory writes as (addr, bytes) runs, applying them in order
+        over the initial memory gives the final image.
+        """
+        bb = self.bb
+        for b, data in self.write_beats(read):
+            if b.burst == AXI_FIXED:
+                # Only the last beat survives at the same address
+                data = data[-bb:]
+            if b.strb == self.full_strb:
+                yield b.addr, data
+                continue
+            lane = 0
+            while lane < bb:
+                if (b.strb>>lane) & 1:
+                    end = lane
+                    while end < bb and (b.strb>>end) & 1:
+                        end += 1
+                    yield b.addr+lane, data[lane:end]
+                    lane = end
+                else:
+                    lane += 1
+
+    def apply(self, read, write):
+        # Builds the expected image through write(addr, data)
+        nbytes = 0
+        for addr, data in self.image(read):
+            write(addr, data)
+            nbytes += len(data)
+        return nbytes
+
+class dma_scoreboard:
+    """
+    Checks the dma_m traffic seen by the axi_monitor against the reference
+    model as every burst completes (AR/AW fields, per beat WSTRB and WDATA).
+    """
+    def __init__(self, model, read, log=None):
+        self.model   = model
+        self.log     = log if log is not None else logging.getLogger("cocotb.dma_scoreboard")
+        self._exp_rd = model.bursts('rd')
+        self._exp_wr = model.write_beats(read)
+        self.errors  = []
+        self.rd_ok   = 0
+        self.wr_ok   = 0
+
+    def _error(self, msg):
+        self.errors.append(msg)
+        self.log.error("[Scoreboard] %s", msg)
+
+    def _check_fields(self, got, exp):
+        for field in ('addr', 'alen', 'size', 'burst'):
+            if getattr(got, field) != getattr(exp, field):
+                self._error(f"{got.kind} burst {field} mismatch: got [{getattr(got, field)}] expected {exp}")
+                return False
+        return True
+
+    def __call__(self, got):
+        # axi_monitor callback, called with every completed burst
+        if got.kind == 'rd':
+            exp = next(self._exp_rd, None)
+            if exp is None:
+                self._error(f"Unexpected rd burst at {hex(got.addr)}")
+            elif self._check_fields(got, exp):
+                self.rd_ok += 1
+            return
+        try:
+            exp, data = next(self._exp_wr, (None, None))
+        except ValueError as e:
+            self._error(str(e))
+            return
+        if exp is None:
+            self._error(f"Unexpected wr burst at {hex(got.addr)}")
+            return
+        if not self._check_fields(got, exp):
+            return
+        bb = self.model.bb
+        for beat, (wdata, wstrb) in enumerate(got.data):
+            if wstrb != exp.strb:
+                self._error(f"WSTRB mismatch beat {beat}: got [{bin(wstrb)}] expected {exp}")
+                return
+            mask = int.from_bytes(bytes(0xFF if (wstrb>>i) & 1 else 0 for i in range(bb)), 'little')
+            edata = int.from_bytes(data[beat*bb:(beat+1)*bb], 'little')
+            if (wdata & mask) != (edata & mask):
+                self._error(f"WDATA mismatch beat {beat}: got [{hex(wdata & mask)}] "
+                            f"expected [{hex(edata & mask)}] {exp}")
+                return
+        self.wr_ok += 1
+
+    def check(self):
+        # Bursts the model still expects are reported as missing
+        for exp in self._exp_rd:
+            self._error(f"Missing burst: {exp}")
+        try:
+            for exp, _ in self._exp_wr:
+                self._error(f"Missing burst: {exp}")
+        except ValueError as e:
+            self._error(str(e))
+        return self.errors
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : regression.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import os
+import json
+import time
+import fcntl
+import itertools
+import importlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from common.constants import cfg_const
+from common.build import RUN_DIR, run_sim
+
+DURATIONS_FILE   = os.path.join(RUN_DIR, "durations.json")
+DEFAULT_DURATION = 60.0 # Seconds assumed for jobs never run before
+DURATION_WEIGHT  = 0.5  # Weight of the last run in the moving average
+
+class reg_job:
+    def __init__(self, module, flavor, testcase=None, label=None):
+        self.module   = module
+        self.flavor   = flavor
+        self.testcase = testcase # None runs all the tests of the module
+        self.label    = label
+        self.estimate = None
+
+    @property
+    def key(self):
+        return f"{self.module}/{self.flavor}/{self.testcase or 'all'}"
+
+    def __str__(self):
+        label = f" [{self.label}]" if self.label else ""
+        return f"{self.key}{label}"
+
+def _opt_label(value):
+    if isinstance(value, range):
+        return f"{value.start}-{value.stop-1}"
+    return getattr(value, '__name__', str(value))
+
+def get_variants(module):
+    """
+    TestFactory variants of a test module from its FACTORY_OPTS, named the
+    way cocotb generates them (run_test_001, ...). Modules without it run
+    as a single job.
+    """
+    opts = getattr(importlib.import_module(module), 'FACTORY_OPTS', None)
+    if not opts:
+        return [(None, None)]
+    variants = []
+    for idx, values in enumerate(itertools.product(*opts.values())):
+        label = ",".join(f"{opt}={_opt_label(val)}" for opt, val in zip(opts, values))
+        variants.append((f"run_test_{idx+1:03d}", label))
+    return variants
+
+def in_regression(module):
+    # Benchmarks set REGRESSION = False next to their options, they have their own tox envs
+    return getattr(importlib.import_module(module), 'REGRESSION', True)
+
+def get_jobs(modules, flavors=None, opt_outs=False):
+    """
+    Jobs of every module/flavor/variant, the modules that opt out of the
+    regression are dropped unless opt_outs (e.g. asked by name).
+    """
+    jobs = []
+    for module in modules:
+        if not opt_outs and not in_regression(module):
+            continue
+        for flavor in (flavors or cfg_const.regression_setup):
+            for testcase, label in get_variants(module):
+                jobs.append(reg_job(module, flavor, testcase, label))
+    return jobs
+
+def load_durations(path=DURATIONS_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_durations(new, path=DURATIONS_FILE):
+    # Merged under a lock, several runners can share the run_dir
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            content = f.read()
+            durations = json.loads(content) if content.strip() else {}
+            for key, secs in new.items():
+                old = durations.get(key)
+                durations[key] = secs if old is None else (DURATION_WEIGHT*secs)+((1-DURATION_WEIGHT)*old)
+            f.seek(0)
+            f.truncate()
+            json.dump(durations, f, indent=2, sort_keys=True)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def schedule(jobs, durations):
+    # Longest processing time first, unknown jobs count as the longest known
+    default = max(durations.values(), default=DEFAULT_DURATION)
+    for job in jobs:
+        job.estimate = durations.get(job.key, default)
+    return sorted(jobs, key=lambda job: job.estimate, reverse=True)
+
+def _run_job(job):
+    start = time.monotonic()
+    error = None
+    try:
+        run_sim(job.module, job.flavor, job.testcase)
+    except KeyboardInterrupt:
+        raise
+    except BaseException as e: # cocotb-test reports failures with SystemExit
+        error = f"{type(e).__name__}: {e}"
+    return error, time.monotonic()-start
+
+def run_regression(jobs, workers=None, log=print):
+    """
+    Runs the jobs longest first in a process pool (the executor hands them
+    out in submission order) and records how long each one took.
+    """
+    order   = schedule(jobs, load_durations())
+    results = {}
+    start   = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_job, job): job for job in order}
+        for future in as_completed(futures):
+            job = futures[future]
+            error, secs = future.result()
+            results[job.key] = (job, error, secs)
+            log(f"[{len(results)}/{len(order)}] {'FAIL' if error else 'PASS'} {job} {secs:.1f}s (est. {job.estimate:.1f}s)")
+    save_durations({key: secs for key, (_, error, secs) in results.items() if error is None})
+    wall = time.monotonic()-start
+    busy = sum(secs for _, _, secs in results.values())
+    log(f"Regression: {len(results)} jobs, wall {wall:.1f}s, cpu {busy:.1f}s, "
+        f"pool efficiency {busy/(wall*(workers or os.cpu_count())):.1%}")
+    return results
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : ring.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import cocotb
+import logging
+from collections import deque
+from cocotb.triggers import Event, First
+from cocotb.utils import get_sim_time
+from common.constants import cfg_const
+from common.dma import dma_desc, dma_xfer
+
+class dma_job:
+    """
+    Handle of a submitted job, awaiting it returns the job once all its
+    chunks went through the DMA. Times in ns of simulation, the latencies
+    in clock cycles.
+    """
+    def __init__(self, job_id, xfers, submit, clk_period_ns):
+        self.job_id  = job_id
+        self.xfers   = xfers
+        self.nbytes  = sum(xfer.nbytes for xfer in xfers)
+        self.submit  = submit
+        self.start   = None # First GO with one of its chunks
+        self.end     = None # dma_done_o of the run with its last chunk
+        self.error   = 0
+        self.chunks  = 0    # Chunks not done yet
+        self._period = clk_period_ns
+        self._done   = Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def latency(self):
+        # Submit to done, queueing included
+        return int((self.end-self.submit)//self._period) if self.end is not None else None
+
+    @property
+    def service(self):
+        return int((self.end-self.start)//self._period) if self.end is not None else None
+
+    def _finish(self, end, error):
+        self.end   = end
+        self.error = self.error | error
+        self._done.set()
+
+    async def wait(self):
+        await self._done.wait()
+        return self
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    def __str__(self):
+        return (f'DMA job {self.job_id}: {len(self.xfers)} xfers {self.nbytes}B '
+                f'latency[{self.latency}] service[{self.service}] error[{self.error}]')
+
+class _chunk:
+    def __init__(self, job, xfer):
+        self.job  = job
+        self.xfer = xfer
+
+    def desc(self, slot, en):
+        x = self.xfer
+        return dma_desc(slot, x.src, x.dst, x.nbytes, x.wr_m, x.rd_m, en)
+
+class desc_ring:
+    """
+    Keeps the DMA busy with the queued jobs. Transfers are split in chunks
+    of max_desc_bytes that take the descriptor slots round robin. The DMA
+    only picks descriptors on GO and clears its done flags at the end of
+    the run, so while a run is in flight the next chunks are programmed in
+    the free slots disabled and the run boundary only flips the CFG enables
+    (stop, enables, GO). Jobs can be submitted at any time.
+    """
+    def __init__(self, tb, max_desc_bytes=None):
+        self.tb       = tb
+        self.log      = logging.getLogger("cocotb.desc_ring")
+        self.num_desc = tb.cfg.NUM_DESC
+        if max_desc_bytes is None:
+            params = dict(cfg_const.DMA_RTL_DEFAULTS)
+            params.update(cfg_const._get_cfg(tb.flavor))
+            max_desc_bytes = ((1<<params['dma_bytes_width'])-1) & ~(tb.bb-1)
+        self.max_desc_bytes = max_desc_bytes
+        self.pending  = deque()                # Chunks waiting a slot
+        self.slots    = [None]*self.num_desc   # Chunk staged/running per slot
+        self.enabled  = [False]*self.num_desc  # CFG enable as programmed
+        self.jobs     = []
+        self.runs     = []                     # (go, done, bytes, chunks) in ns
+        self._next    = 0                      # Round robin slot pointer
+        self._wake    = Event()
+        self._cr      = None
+
+    def submit(self, transfers):
+        xfers = [xfer if isinstance(xfer, dma_xfer) else dma_xfer(*xfer) for xfer in transfers]
+        job = dma_job(len(self.jobs), xfers, get_sim_time(units='ns'), self.tb.clk_period_ns)
+        self.jobs.append(job)
+        for xfer in xfers:
+            for chunk in xfer.split(self.max_desc_bytes):
+                self.pending.append(_chunk(job, chunk))
+                job.chunks += 1
+        if job.chunks == 0:
+            job._finish(job.submit, 0)
+        self._wake.set()
+        if self._cr is None:
+            self._cr = cocotb.start_soon(self._run())
+        return job
+
+    async def drain(self):
+        # Waits every job submitted so far
+        for job in list(self.jobs):
+            await job
+        return self.jobs
+
+    def stop(self):
+        if self._cr is not None:
+            self._cr.kill()
+            self._cr = None
+
+    def _fill(self):
+        # Free slots round robin, oldest chunks first
+        descs = []
+        for n in range(self.num_desc):
+            if len(self.pending) == 0:
+                break
+            slot = (self._next+n) % self.num_desc
+            if self.slots[slot] is None:
+                self.slots[slot] = self.pending.popleft()
+                descs.append(slot)
+        if len(descs) > 0:
+            self._next = (descs[-1]+1) % self.num_desc
+        return descs
+
+    async def _stage(self):
+        # Programmed disabled, the running DMA ignores them
+        slots = self._fill()
+        if len(slots) > 0:
+            await self.tb.prg_desc([self.slots[slot].desc(slot, 0) for slot in slots], skip_known=True)
+            for slot in slots:
+                self.enabled[slot] = False
+
+    async def _launch(self):
+        tb   = self.tb
+        self._fill()
+        run  = [slot for slot in range(self.num_desc) if self.slots[slot] is not None]
+        descs = [self.slots[slot].desc(slot, 1) for slot in run]
+        for slot in range(self.num_desc):
+            if self.slots[slot] is None and self.enabled[slot]:
+                last = tb.prg_descs[slot]
+                descs.append(dma_desc(slot, last.src, last.dst, last.nbytes, last.wr_m, last.rd_m, 0))
+        # Only the CFGs of the staged slots change, skip_known drops the rest
+        await tb.prg_desc(descs, skip_known=True)
+        for desc in descs:
+            self.enabled[desc.desc_id] = bool(desc.en)
+        await tb.start_dma()
+        go = get_sim_time(units='ns')
+        for slot in run:
+            job = self.slots[slot].job
+            if job.start is None:
+                job.start = go
+        return run, go
+
+    async def _run(self):
+        tb = self.tb
+        while True:
+            if len(self.pending) == 0 and all(chunk is None for chunk in self.slots):
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            run, go = await self._launch()
+            done = cocotb.start_soon(tb.wait_done())
+            while not done.done():
+                self._wake.clear()
+                await self._stage()
+                if done.done():
+                    break
+                await First(done, self._wake.wait())
+            result = done.result()
+            end = get_sim_time(units='ns')
+            await tb.stop_dma()
+            nbytes = 0
+            for slot in run:
+                chunk = self.slots[slot]
+                self.slots[slot] = None
+                nbytes += chunk.xfer.nbytes
+                chunk.job.chunks -= 1
+                if result.error:
+                    chunk.job.error = 1
+                if chunk.job.chunks == 0:
+                    chunk.job._finish(end, chunk.job.error)
+            self.runs.append((go, end, nbytes, len(run)))
+            if result.error:
+                self.log.error("DMA error on the run of slots %s", run)
+
+    def report(self):
+        """
+        Throughput from the first GO to the last done and the cycles the
+        DMA sat idle between runs (stop, CFG enables and GO writes).
+        """
+        period = self.tb.clk_period_ns
+        if len(self.runs) == 0:
+            return {'runs': 0, 'jobs': len(self.jobs), 'bytes': 0}
+        span  = max(int((self.runs[-1][1]-self.runs[0][0])//period), 1)
+        busy  = sum(int((end-go)//period) for go, end, _, _ in self.runs)
+        gaps  = [int((nxt[0]-cur[1])//period) for cur, nxt in zip(self.runs, self.runs[1:])]
+        lats  = [job.latency for job in self.jobs if job.done]
+        nbytes = sum(run[2] for run in self.runs)
+        return {'runs': len(self.runs), 'jobs': len(self.jobs), 'bytes': nbytes,
+                'cycles': span, 'busy_cycles': busy, 'bytes_per_cycle': nbytes/span,
+                'avg_chunks_per_run': sum(run[3] for run in self.runs)/len(self.runs),
+                'avg_gap': sum(gaps)/len(gaps) if len(gaps) > 0 else 0.0,
+                'max_gap': max(gaps, default=0),
+                'avg_latency': sum(lats)/len(lats) if len(lats) > 0 else 0.0,
+                'max_latency': max(lats, default=0)}
@@ -4,40 +4,114 @@
 # License           : MIT license <Check LICENSE>
 # Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
 # Date              : 04.06.2022
-# Last Modified Date: 16.10.2022
+# Last Modified Date: 18.10.2026
 # Last Modified By  : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
 import cocotb
 import os, errno
 import logging, string, random
+import operator
+import json
 from logging.handlers import RotatingFileHandler
 from cocotb.log import SimLogFormatter, SimColourLogFormatter, SimLog, SimTimeContextFilter
 from common.constants import cfg_const
-from common.dma import dma_desc, dma_mode, dma_addr, dma_ctrl, dma_error_stats
+from common.dma import dma_desc, dma_desc_table, dma_mode, dma_addr, dma_ctrl, dma_error_stats
+from common.monitor import axi_monitor, occupancy_monitor
+from common.csr import csr_model
+from common.memory import paged_memory, mmap_memory
+from common.ref_model import dma_ref_model, dma_scoreboard
+from common.wave import wave_ring, get_handle
+from common.traffic import traffic_profile
+from common.mem_slave import axi_mem_slave
+from common.ring import desc_ring
 from cocotb.clock import Clock
 from datetime import datetime
-from cocotb.triggers import ClockCycles, RisingEdge, with_timeout, ReadOnly, Event
+from cocotb.triggers import ClockCycles, RisingEdge, with_timeout, ReadOnly, Event, First, Combine
+from cocotb.utils import get_sim_time
+from cocotb.result import SimTimeoutError
 from cocotbext.axi import AxiBus, AxiLiteBus
 from cocotbext.axi import AxiLiteRam, AxiRam
 from cocotbext.axi import AxiResp, AxiLiteMaster, AxiSlave
+from cocotbext.axi.axil_master import AxiLiteReadResp
 from cocotb.result import TestFailure
 
+class cmp_result:
+    def __init__(self, src, dst, nbytes, offset=None, ndiff=0, exp=b'', got=b''):
+        self.src    = src
+        self.dst    = dst
+        self.nbytes = nbytes
+        self.offset = offset
+        self.ndiff  = ndiff
+        self.exp    = exp
+        self.got    = got
+
+    def __bool__(self):
+        return self.offset is None
+
+    @property
+    def summary(self):
+        if self.offset is None:
+            return f'Regions match: src[{hex(self.src)}] dst[{hex(self.dst)}] {self.nbytes}B'
+        return (f'{self.ndiff}/{self.nbytes}B mismatch, first at offset {hex(self.offset)} '
+                f'(dst addr {hex(self.dst+self.offset)}): expected [{self.exp.hex()}] got [{self.got.hex()}]')
+
+class dma_result:
+    def __init__(self, cycles, done, error):
+        self.cycles = cycles
+        self.done   = done
+        self.error  = error
+
+    def __str__(self):
+        return f'DMA result: done[{self.done}] error[{self.error}] cycles[{self.cycles}]'
+
 class Tb:
-    def __init__(self, dut, log_name, cfg, flavor, ram_size=(2**12)):
+    def __init__(self, dut, log_name, cfg, flavor, ram_size=(2**12), csr_cache=False, sparse=False, ram_file=None, ram_image=None,
+                 mem_model=None):
         self.dut = dut
         self.cfg = cfg
         self.flavor = flavor
-        self.bb = 4 if flavor == '32' or flavor == 'small' else 8 # Number of bytes per data bus lane
+        self.bb = cfg_const._get_cfg(flavor)['axi_data_width']//8 # Number of bytes per data bus lane
         self.max_addr = ((2**32)-1)
-        self.max_data = ((2**32)-1) if flavor == '32' or flavor == 'small' else ((2**64)-1)
+        self.max_data = ((2**(self.bb*8))-1)
         timenow_wstamp = self._gen_log(log_name)
         self.maxb = 255
+        self.prg_bytes = {} # desc_id -> enabled bytes programmed
+        self.prg_descs = {} # desc_id -> last dma_desc programmed
+        self.csr = csr_model(cfg.DMA_CSRs) # Mirror of the CSRs written by the Tb
+        self.csr_cache = csr_cache # Serve non-volatile reads from the mirror
         self.log.info("------------[LOG - %s]------------",timenow_wstamp)
         self.log.info("SEED: %s",str(cocotb.RANDOM_SEED))
         self.log.info("Log file: %s",log_name)
         self.csr_axi_if = AxiLiteMaster(AxiLiteBus.from_prefix(self.dut, "dma_s"), self.dut.clk, self.dut.rst)
-        self.axi_ram = AxiRam(AxiBus.from_prefix(self.dut, "dma_m"), self.dut.clk, self.dut.rst, size=ram_size)
+        # Sparse pages for big address spaces (ram_size is just the span) or
+        # a copy on write mapping of a prefilled image file
+        if ram_image is not None:
+            self.ram_mem = mmap_memory(ram_image, ram_size)
+        elif sparse or ram_file:
+            self.ram_mem = paged_memory(ram_size, path=ram_file)
+        else:
+            self.ram_mem = None
+        # A memory timing model (name of cfg_const.MEM_PROFILES or its dict)
+        # replaces the zero latency AxiRam, the memory API stays the same
+        if mem_model is None:
+            mem_model = cfg_const.MEM_MODEL
+        if isinstance(mem_model, str):
+            mem_model = cfg_const.MEM_PROFILES[mem_model]
+        if mem_model:
+            self.log.info("dma_m memory model: %s", mem_model)
+            self.axi_ram = axi_mem_slave(AxiBus.from_prefix(self.dut, "dma_m"), self.dut.clk, self.dut.rst,
+                                         size=ram_size, mem=self.ram_mem, **mem_model)
+        else:
+            self.axi_ram = AxiRam(AxiBus.from_prefix(self.dut, "dma_m"), self.dut.clk, self.dut.rst, size=ram_size, mem=self.ram_mem)
         self.axi_ram.write_if.log.setLevel(logging.DEBUG)
         self.axi_ram.read_if.log.setLevel(logging.DEBUG)
+        self.axi_mon = None
+        self.scoreboard = None
+        self.wave_ring = None
+        self.occ_mon = None
+        self.ring = None
+        self.clk_period_ns = cfg_const.CLK_100MHz[0]
+        if cfg_const.WAVES == "ring":
+            self.start_wave_ring()
 
     def __del__(self):
         # Need to write the last strings in the buffer in the file
@@ -45,21 +119,29 @@ class Tb:
         self.log.removeHandler(self.file_handler)
         self.file_handler.close()
 
+    def _set_pause(self, channels, generator):
+        # traffic profiles get the channel name to seed each one on its own
+        for name, channel in channels:
+            if isinstance(generator, traffic_profile):
+                channel.set_pause_generator(generator(name))
+            else:
+                channel.set_pause_generator(generator())
+
     def set_idle_generator(self, generator=None):
         if generator:
-            self.csr_axi_if.write_if.aw_channel.set_pause_generator(generator())
-            self.csr_axi_if.write_if.w_channel.set_pause_generator(generator())
-            self.csr_axi_if.read_if.ar_channel.set_pause_generator(generator())
-            self.axi_ram.write_if.b_channel.set_pause_generator(generator())
-            self.axi_ram.read_if.r_channel.set_pause_generator(generator())
+            self._set_pause([("dma_s_aw", self.csr_axi_if.write_if.aw_channel),
+                             ("dma_s_w",  self.csr_axi_if.write_if.w_channel),
+                             ("dma_s_ar", self.csr_axi_if.read_if.ar_channel),
+                             ("dma_m_b",  self.axi_ram.write_if.b_channel),
+                             ("dma_m_r",  self.axi_ram.read_if.r_channel)], generator)
 
     def set_backpressure_generator(self, generator=None):
         if generator:
-            self.csr_axi_if.write_if.b_channel.set_pause_generator(generator())
-            self.csr_axi_if.read_if.r_channel.set_pause_generator(generator())
-            self.axi_ram.write_if.aw_channel.set_pause_generator(generator())
-            self.axi_ram.write_if.w_channel.set_pause_generator(generator())
-            self.axi_ram.read_if.ar_channel.set_pause_generator(generator())
+            self._set_pause([("dma_s_b",  self.csr_axi_if.write_if.b_channel),
+                             ("dma_s_r",  self.csr_axi_if.read_if.r_channel),
+                             ("dma_m_aw", self.axi_ram.write_if.aw_channel),
+                             ("dma_m_w",  self.axi_ram.write_if.w_channel),
+                             ("dma_m_ar", self.axi_ram.read_if.ar_channel)], generator)
 
     def get_settings(self):
         run_settings = {}
@@ -78,43 +160,319 @@ class Tb:
                 self.log.info(f"[AXI RAM] Loading: {addr_h} - {data_p.hex()}")
             self.axi_ram.write(addr, data)
 
-    async def wait_done(self):
-        timeout_cnt = 0
-        while int(self.dut.dma_done_o == 0):
-            await RisingEdge(self.dut.clk)
-            if timeout_cnt == self.cfg.TIMEOUT_VAL:
-                self.log.error("Timeout on waiting for DMA DONE")
-                raise TestFailure("Timeout on waiting for DMA DONE")
+    def load_ram(self, addr, data):
+        # Loads a whole buffer (bytes/bytearray/memoryview/numpy) in one shot
+        buff = memoryview(data).cast('B')
+        self.axi_ram.write(addr, buff)
+        return len(buff)
+
+    def fill_ram_random(self, addr, nbytes):
+        # Seeded through cocotb.RANDOM_SEED, so runs are reproducible
+        data = random.randbytes(nbytes)
+        self.axi_ram.write(addr, data)
+        return data
+
+    def ram_view(self, addr, nbytes):
+        # Zero-copy when the backing store exports a buffer (mmap),
+        # otherwise a single read of the whole region
+        if hasattr(self.axi_ram.mem, 'view'):
+            return self.axi_ram.mem.view(addr, nbytes)
+        try:
+            return memoryview(self.axi_ram.mem)[addr:addr+nbytes]
+        except TypeError:
+            return memoryview(self.axi_ram.read(addr, nbytes))
+
+    def snapshot_ram(self):
+        # Only the written pages for an image backed RAM, a full copy otherwise
+        if isinstance(self.ram_mem, mmap_memory):
+            return self.ram_mem.snapshot()
+        return self.axi_ram.read(0, self.axi_ram.size)
+
+    def restore_ram(self, snap=None):
+        # Without a snapshot an image backed RAM goes back to the file content
+        if isinstance(self.ram_mem, mmap_memory):
+            self.ram_mem.restore(snap)
+        elif snap is not None:
+            self.axi_ram.write(0, snap)
+        else:
+            raise ValueError("Restoring needs a snapshot unless the RAM is image backed")
+
+    def save_ram(self, path):
+        if isinstance(self.ram_mem, mmap_memory):
+            return self.ram_mem.save(path)
+        with open(path, 'wb') as f:
+            f.write(self.axi_ram.read(0, self.axi_ram.size))
+        return path
+
+    def ram_usage(self):
+        # Resident size of the dma_m memory, only tracked for paged/image backed ones
+        if self.ram_mem is None:
+            return {'resident_bytes': self.axi_ram.size, 'span_bytes': self.axi_ram.size}
+        self.log.info("%s", self.ram_mem)
+        return self.ram_mem.report()
+
+    def compare_regions(self, src, dst, nbytes, rd_m=dma_mode.INCR, wr_m=dma_mode.INCR):
+        """
+        Compares the destination against what the DMA should have written,
+        FIXED read repeats the first src word and FIXED write keeps only the
+        last src word in the first dst word.
+        """
+        bb = self.bb
+        aligned_src = src & ~(bb-1)
+        if rd_m == dma_mode.FIXED:
+            exp = bytes(self.ram_view(aligned_src, bb))
+            if wr_m == dma_mode.FIXED:
+                nbytes = bb
             else:
-                timeout_cnt += 1
+                exp = exp*(nbytes//bb)
+        elif wr_m == dma_mode.FIXED:
+            exp = bytes(self.ram_view(src+nbytes-bb, bb))
+            nbytes = bb
+        else:
+            exp = self.ram_view(src, nbytes)
+        got = self.ram_view(dst, nbytes)
+        if exp == got:
+            return cmp_result(src, dst, nbytes)
+        diff = int.from_bytes(exp, 'little') ^ int.from_bytes(got, 'little')
+        offset = ((diff & -diff).bit_length()-1)//8
+        ndiff = nbytes-diff.to_bytes(nbytes, 'little').count(0)
+        word = offset & ~(bb-1)
+        return cmp_result(src, dst, nbytes, offset, ndiff, bytes(exp[word:word+bb]), bytes(got[word:word+bb]))
+
+    def check_regions(self, src, dst, nbytes, rd_m=dma_mode.INCR, wr_m=dma_mode.INCR):
+        res = self.compare_regions(src, dst, nbytes, rd_m, wr_m)
+        if not res:
+            self.log.error(res.summary)
+            self.log.debug("%s", self.axi_ram.hexdump_str(res.dst+(res.offset & ~(self.bb-1)), self.bb))
+            self.dump_waves("check_regions")
+        assert res, res.summary
+        return res
+
+    def regions_differ(self, src, dst, nbytes):
+        # True when no bus word of src matches the same word in dst
+        assert nbytes % self.bb == 0, f"regions_differ compares whole bus words, {nbytes}B is not a multiple of {self.bb}B"
+        for addr in (src, dst):
+            assert 0 <= addr and addr+nbytes <= self.axi_ram.size, \
+                   f"regions_differ range {hex(addr)}+{nbytes}B outside the {self.axi_ram.size}B RAM"
+        fmt = 'I' if self.bb == 4 else 'Q'
+        src_w = self.ram_view(src, nbytes).cast(fmt)
+        dst_w = self.ram_view(dst, nbytes).cast(fmt)
+        return not any(map(operator.eq, src_w, dst_w))
+
+    def start_axi_monitor(self, capture=False):
+        # Passive monitor on the dma_m port, restarts the counters if running
+        if self.axi_mon is None:
+            self.axi_mon = axi_monitor(self.dut, "dma_m", self.dut.clk, self.dut.rst)
+        self.axi_mon.clear()
+        self.axi_mon.capture   = capture
+        self.axi_mon.callbacks = []
+        self.axi_mon.start()
+
+    def stop_axi_monitor(self):
+        # Counters are kept, so axi_perf_report still works
+        if self.axi_mon is not None:
+            self.axi_mon.stop()
+
+    def start_scoreboard(self, descriptors=None):
+        """
+        Checks every dma_m burst against the reference model while the DMA
+        runs, by default with the descriptors programmed through prg_desc.
+        Call it before start_dma.
+        """
+        if descriptors is None:
+            descriptors = self.prg_descs.values()
+        model = dma_ref_model(descriptors, self.bb, self.maxb, self.flavor)
+        self.scoreboard = dma_scoreboard(model, self.ram_view, self.log)
+        self.start_axi_monitor(capture=True)
+        self.axi_mon.add_callback(self.scoreboard)
+        return self.scoreboard
+
+    def check_scoreboard(self):
+        errors = self.scoreboard.check()
+        self.log.info("[Scoreboard] %d rd / %d wr bursts matched, %d errors",
+                      self.scoreboard.rd_ok, self.scoreboard.wr_ok, len(errors))
+        if len(errors) != 0:
+            self.dump_waves("scoreboard")
+        assert len(errors) == 0, f"Scoreboard: {errors[0]} ({len(errors)} errors)"
+        return self.scoreboard
 
-    async def prg_desc(self, descriptors, **kwargs):
+    def start_occupancy(self):
+        """
+        Histograms of the DMA FIFO occupancy and of the pending rd/wr txn
+        counters from now on, capacities from the flavor (or RTL defaults).
+        """
+        if self.occ_mon is None:
+            params = dict(cfg_const.DMA_RTL_DEFAULTS)
+            params.update(cfg_const._get_cfg(self.flavor))
+            paths = cfg_const.DUT_PATHS
+            self.occ_mon = occupancy_monitor({
+                'fifo': (get_handle(self.dut, paths['fifo_ocup']), params['dma_fifo_depth']),
+                'rd_pend': (get_handle(self.dut, paths['rd_pend']), params['dma_rd_txn_buff']),
+                'wr_pend': (get_handle(self.dut, paths['wr_pend']), params['dma_wr_txn_buff'])
+            }, self.clk_period_ns)
+            self.occ_mon.start()
+        self.occ_mon.clear()
+        return self.occ_mon
+
+    def occupancy_report(self, tag=None):
+        # Dumped next to the test log, one file per variant and tag
+        report = self.occ_mon.report()
+        self.log.info("[Occupancy] %s", self.occ_mon.summary(report))
+        if tag is not None:
+            self.dump_json(f"occupancy_{tag}", report)
+        return report
+
+    def start_wave_ring(self, depth=None, signals=None):
+        """
+        Keeps the last depth cycles of the dma_m/dma_s/FSM signals in memory,
+        they are only written (VCD next to the log) when dump_waves() is
+        called: timeouts, failed checks or dma_error_o rising.
+        """
+        if self.wave_ring is None:
+            self.wave_ring = wave_ring(self.dut, self.clk_period_ns, depth or cfg_const.WAVE_RING_CYCLES, signals)
+            self.wave_ring.start()
+            cocotb.start_soon(self._wave_on_error())
+        return self.wave_ring
+
+    async def _wave_on_error(self):
+        while True:
+            await RisingEdge(self.dut.dma_error_o)
+            await ClockCycles(self.dut.clk, cfg_const.WAVE_RING_POST)
+            self.dump_waves("dma_error")
+
+    def dump_waves(self, reason):
+        if self.wave_ring is None:
+            return None
+        return self.wave_ring.dump(f"{self.log_base}_{reason}_{len(self.wave_ring.dumps)}.vcd",
+                                   f"{reason} at {get_sim_time(units='ns')}ns")
+
+    def axi_perf_report(self, tag=None, with_bursts=True):
+        report = self.axi_mon.report(self.clk_period_ns)
+        self.log.info("%s", report)
+        if tag is not None:
+            self.dump_json(f"axi_perf_{tag}", report.to_dict(with_bursts))
+        return report
+
+    def dump_json(self, name, data):
+        # Results land next to the test log
+        path = f"{self.log_base}_{name}.json"
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def submit(self, transfers, max_desc_bytes=None):
+        """
+        Queues a job (list of dma_xfer or (src, dst, nbytes[, wr_m, rd_m]))
+        on the descriptor ring and returns its dma_job, await it for the per
+        job latency. The ring owns the descriptors and GO from then on, do
+        not mix it with prg_desc/start_dma while jobs are in flight.
+        """
+        if self.ring is None:
+            self.ring = desc_ring(self, max_desc_bytes)
+        return self.ring.submit(transfers)
+
+    def get_done_timeout(self, nbytes=None):
+        # Cycles budget scaled with what was programmed in the descriptors
+        if nbytes is None:
+            nbytes = sum(self.prg_bytes.values())
+        beats  = -(-nbytes//self.bb)
+        bursts = -(-beats//(min(self.maxb, 255)+1))
+        return self.cfg.TIMEOUT_VAL+(beats*self.cfg.TIMEOUT_BEAT_CYCLES)+(bursts*self.cfg.TIMEOUT_BURST_CYCLES)
+
+    async def wait_done(self, nbytes=None, timeout_cycles=None, stop_on_error=False):
+        # Sleeps until dma_done_o/dma_error_o toggles instead of polling every clock
+        start = get_sim_time(units='ns')
+        if timeout_cycles is None:
+            timeout_cycles = self.get_done_timeout(nbytes)
+        deadline = start+(timeout_cycles*self.clk_period_ns)
+        error = int(self.dut.dma_error_o.value) == 1
+        while self.dut.dma_done_o.value != 1 and not (error and stop_on_error):
+            try:
+                await with_timeout(First(RisingEdge(self.dut.dma_done_o), RisingEdge(self.dut.dma_error_o)),
+                                   max(deadline-get_sim_time(units='ns'), self.clk_period_ns), 'ns')
+            except SimTimeoutError:
+                self.log.error("Timeout on waiting for DMA DONE (%d cycles)", timeout_cycles)
+                self.dump_waves("timeout")
+                raise TestFailure("Timeout on waiting for DMA DONE")
+            error = error or int(self.dut.dma_error_o.value) == 1
+        cycles = int((get_sim_time(units='ns')-start)//self.clk_period_ns)
+        return dma_result(cycles, int(self.dut.dma_done_o.value), int(error))
+
+    async def prg_desc(self, descriptors, pipelined=True, skip_known=False, **kwargs):
+        """
+        Programs SRC/DST/NUM_BYTES/CFG of each descriptor. When pipelined all
+        the writes are put in flight at once (the AXI Lite master queues keep
+        its outstanding limit) and awaited as a group. skip_known drops the
+        writes whose value already matches the shadow copy.
+        """
+        writes = []
         for desc in descriptors:
-            addr = desc.get_addr(dma_addr.SRC)
-            data = desc.src.to_bytes(self.bb,'little')
-            write = self.csr_axi_if.init_write(addr, data, **kwargs)
-            await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
-            addr = desc.get_addr(dma_addr.DST)
-            data = desc.dst.to_bytes(self.bb, 'little')
-            write = self.csr_axi_if.init_write(addr, data, **kwargs)
-            await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
-            addr = desc.get_addr(dma_addr.BYT)
-            data = desc.nbytes.to_bytes(self.bb, 'little')
-            write = self.csr_axi_if.init_write(addr, data, **kwargs)
-            await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
-            addr = desc.get_addr(dma_addr.CFG)
-            data = desc.cfg.to_bytes(self.bb, 'little')
-            write = self.csr_axi_if.init_write(addr, data, **kwargs)
-            await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
-        ret = write.data
+            self.prg_bytes[desc.desc_id] = desc.nbytes if desc.en else 0
+            self.prg_descs[desc.desc_id] = desc
+            for field, value in ((dma_addr.SRC, desc.src), (dma_addr.DST, desc.dst),
+                                 (dma_addr.BYT, desc.nbytes), (dma_addr.CFG, desc.cfg)):
+                addr = desc.get_addr(field)
+                if skip_known and self.csr.lookup(addr) == value:
+                    continue
+                data  = value.to_bytes(self.bb, 'little')
+                write = self.csr_axi_if.init_write(addr, data, **kwargs)
+                self.csr.write(addr, value)
+                writes.append((addr, write))
+                if not pipelined:
+                    await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
+        if len(writes) == 0:
+            return None
+        if pipelined:
+            await with_timeout(Combine(*[write.wait() for _, write in writes]), *cfg_const.TIMEOUT_AXI)
+        for addr, write in writes:
+            if write.data is None or write.data.resp != AxiResp.OKAY:
+                self.csr.invalidate(addr)
+        ret = writes[-1][1].data
         return ret
 
+    async def prg_desc_table(self, table, **kwargs):
+        """
+        Writes a dma_desc_table from its CSR image, a bus wide beat per CSR
+        (the 32b bus can not take the 8B slots as one word) all in flight at
+        once. The shadow copy, prg_bytes and prg_descs follow the image.
+        """
+        image  = table.pack()
+        base   = table.base()
+        step   = self.cfg.CSR_ADDR_ALIG
+        writes = []
+        for off in range(0, len(image), step):
+            addr  = base+off
+            write = self.csr_axi_if.init_write(addr, image[off:off+self.bb], **kwargs)
+            self.csr.write(addr, int.from_bytes(image[off:off+step], 'little'))
+            writes.append((addr, write))
+        await with_timeout(Combine(*[write.wait() for _, write in writes]), *cfg_const.TIMEOUT_AXI)
+        for addr, write in writes:
+            if write.data is None or write.data.resp != AxiResp.OKAY:
+                self.csr.invalidate(addr)
+        for idx in range(len(table)):
+            self.prg_bytes[idx] = table.nbytes(idx)
+            self.prg_descs[idx] = table[idx]
+        return writes[-1][1].data
+
+    async def read_desc_table(self, **kwargs):
+        # Reads back the descriptor CSRs from the bus, reads in flight at once
+        num_desc = self.cfg.NUM_DESC
+        base     = dma_desc_table.base()
+        step     = self.cfg.CSR_ADDR_ALIG
+        size     = len(dma_desc_table(num_desc).pack())
+        reads    = [self.csr_axi_if.init_read(base+off, min(self.bb, 4), **kwargs) for off in range(0, size, step)]
+        await with_timeout(Combine(*[read.wait() for read in reads]), *cfg_const.TIMEOUT_AXI)
+        image = bytearray(size)
+        for idx, read in enumerate(reads):
+            if read.data is None or read.data.resp != AxiResp.OKAY:
+                raise TestFailure(f"Error reading the descriptor CSR at {hex(base+(idx*step))}")
+            image[idx*step:(idx*step)+len(read.data.data)] = read.data.data
+        return dma_desc_table.unpack(image, num_desc)
+
     async def prg_ctrl(self, dma_ctrl, **kwargs):
         addr  = dma_ctrl.addr
         data  = dma_ctrl.value.to_bytes(self.bb, 'little')
-        write = self.csr_axi_if.init_write(addr, data, **kwargs)
-        await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
-        ret = write.data
+        ret = await self.write(addr, data, **kwargs)
         return ret
 
     def set_max_burst(self, max_burst, **kwargs):
@@ -122,63 +480,74 @@ class Tb:
 
     async def read_error_stats(self, **kwargs):
         addr  = self.cfg.DMA_CSRs['DMA_ERROR_MISC'][0]
-        read = self.csr_axi_if.init_read(address=address, length=length, **kwargs)
-        await with_timeout(read.wait(), *cfg_const.TIMEOUT_AXI)
-        resp = read.data
+        resp = await self.read(addr, 4, cached=False, **kwargs)
         return resp
 
     async def start_dma(self, **kwargs):
         addr  = self.cfg.DMA_CSRs['DMA_CONTROL'][0]
         dataW = ((self.maxb<<2)|(0<<1)|1) # MAX_BURST[7:0] ABORT[1] GO[0]
         dataW = dataW.to_bytes(self.bb,'little')
-        write = self.csr_axi_if.init_write(address=addr, data=dataW, **kwargs)
-        await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
-        ret = write.data
+        ret = await self.write(addr, dataW, **kwargs)
         return ret
 
     async def stop_dma(self, **kwargs):
         addr  = self.cfg.DMA_CSRs['DMA_CONTROL'][0]
         dataW = ((self.maxb<<2)|(0<<1)|0) # MAX_BURST[7:0] ABORT[1] GO[0]
         dataW = dataW.to_bytes(self.bb,'little')
-        write = self.csr_axi_if.init_write(address=addr, data=dataW, **kwargs)
-        await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
-        ret = write.data
+        ret = await self.write(addr, dataW, **kwargs)
         return ret
 
     async def abort_dma(self, **kwargs):
         addr  = self.cfg.DMA_CSRs['DMA_CONTROL'][0]
         dataW = 0x3FF # MAX_BURST[7:0] ABORT[1] GO[0]
         dataW = dataW.to_bytes(self.bb,'little')
-        write = self.csr_axi_if.init_write(address=addr, data=dataW, **kwargs)
-        await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
-        ret = write.data
+        ret = await self.write(addr, dataW, **kwargs)
         return ret
 
     async def write(self, address=0x0, data=0x0, **kwargs):
         # self.log.info("[AXI Lite Master - Write] Address = ["+str(hex(address))+"] ")
+        self.csr.invalidate(address)
         write = self.csr_axi_if.init_write(address=address, data=data, **kwargs)
         await with_timeout(write.wait(), *cfg_const.TIMEOUT_AXI)
         ret = write.data
+        if ret is not None and ret.resp == AxiResp.OKAY:
+            self.csr.write(address, int.from_bytes(data, byteorder='little', signed=False))
         return ret
 
-    async def read(self, address=0x0, length=4, **kwargs):
+    async def read(self, address=0x0, length=4, cached=None, mask=None, **kwargs):
         # self.log.info("[AXI Lite Master - Read] Slave = Address = ["+str(hex(address))+"] / Length = ["+str(length)+" bytes]")
+        if cached is None:
+            cached = self.csr_cache
+        if cached:
+            value = self.csr.read(address, mask)
+            if value is not None:
+                return AxiLiteReadResp(address, value.to_bytes(length, 'little'), AxiResp.OKAY)
         read = self.csr_axi_if.init_read(address=address, length=length, **kwargs)
         await with_timeout(read.wait(), *cfg_const.TIMEOUT_AXI)
         resp = read.data
+        if resp is not None and resp.resp == AxiResp.OKAY:
+            self.csr.update(address, int.from_bytes(resp.data, byteorder='little', signed=False))
         return resp
 
     async def setup_clks(self, clk_mode="100MHz"):
         self.log.info(f"[Setup] Configuring the clocks: {clk_mode}")
         if clk_mode == "100MHz":
+            self.clk_period_ns = cfg_const.CLK_100MHz[0]
             await cocotb.start(Clock(self.dut.clk, *cfg_const.CLK_100MHz).start())
         elif clk_mode == "200MHz":
+            self.clk_period_ns = cfg_const.CLK_200MHz[0]
             await cocotb.start(Clock(self.dut.clk, *cfg_const.CLK_200MHz).start())
         else:
+            self.clk_period_ns = cfg_const.CLK_200MHz[0]
             await cocotb.start(Clock(self.dut.clk, *cfg_const.CLK_200MHz).start())
+        if self.wave_ring is not None:
+            self.wave_ring.period = self.clk_period_ns
 
     async def rst(self, clk_mode="100MHz"):
         self.log.info("[Setup] Reset DUT")
+        self.csr.reset()
+        self.prg_bytes = {}
+        self.prg_descs = {}
         self.dut.rst.setimmediatevalue(1)
         self.dut.rst.value = 1
         if clk_mode == "100MHz":
@@ -193,6 +562,7 @@ class Tb:
         timenow_wstamp = timenow + str("_") + str(datetime.timestamp(datetime.now()))
         self.log = SimLog(log_name)
         self.log.setLevel(logging.DEBUG)
+        self.log_base = f"{log_name}_{timenow}"
         self.file_handler = RotatingFileHandler(f"{log_name}_{timenow}.log", maxBytes=(5 * 1024 * 1024), backupCount=2, mode='w')
         self._symlink_force(f"{log_name}_{timenow}.log",f"latest_{log_name}.log")
         self.file_handler.setFormatter(SimLogFormatter())
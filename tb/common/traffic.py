@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : traffic.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import json
+import random
+import itertools
+
+from abc import ABC, abstractmethod
+
+class traffic_profile(ABC):
+    """
+    Pause generator factory for the cocotbext-axi channels, calling it with
+    the channel name returns the iterator (1 = pause the cycle). Random
+    profiles derive one seed per channel so the channels stall
+    independently but every run with the same seed is identical.
+    pause_rate is the long run fraction of paused cycles.
+    """
+    def __init__(self, seed=None):
+        # Drawn from the cocotb seeded RNG when not given
+        self.seed = seed if seed is not None else random.getrandbits(32)
+
+    def _rng(self, channel):
+        return random.Random(f"{self.seed}:{channel}")
+
+    @property
+    @abstractmethod
+    def pause_rate(self):
+        pass
+
+    @property
+    def bandwidth(self):
+        # Fraction of the cycles the channel is allowed to move data
+        return 1.0-self.pause_rate
+
+    @abstractmethod
+    def gen(self, channel):
+        pass
+
+    def __call__(self, channel=None):
+        return self.gen(channel)
+
+    def __str__(self):
+        return type(self).__name__
+
+class pattern(traffic_profile):
+    # Fixed repeating pattern, same on every channel
+    def __init__(self, seq, name=None):
+        super().__init__(0)
+        self.seq  = list(seq)
+        self.name = name
+
+    @property
+    def pause_rate(self):
+        return sum(self.seq)/len(self.seq)
+
+    def gen(self, channel):
+        return itertools.cycle(self.seq)
+
+    def __str__(self):
+        return self.name or f"pattern_{''.join(str(v) for v in self.seq)}"
+
+class bernoulli(traffic_profile):
+    # Every cycle pauses with probability p, no correlation between cycles
+    def __init__(self, p, seed=None):
+        super().__init__(seed)
+        self.p = p
+
+    @property
+    def pause_rate(self):
+        return self.p
+
+    def gen(self, channel):
+        rng = self._rng(channel)
+        p   = self.p
+        while True:
+            yield int(rng.random() < p)
+
+    def __str__(self):
+        return f"bernoulli_{self.p}"
+
+class markov_onoff(traffic_profile):
+    """
+    Two state (ready/stalled) Markov chain, the time spent in each state is
+    geometric with the given means so stalls come in correlated bursts.
+    """
+    def __init__(self, mean_on, mean_off, seed=None):
+        super().__init__(seed)
+        if mean_on < 1 or mean_off < 1:
+            raise ValueError("Mean on/off lengths must be >= 1 cycle")
+        self.mean_on  = mean_on
+        self.mean_off = mean_off
+
+    @property
+    def pause_rate(self):
+        return self.mean_off/(self.mean_on+self.mean_off)
+
+    def gen(self, channel):
+        rng    = self._rng(channel)
+        leave  = (1.0/self.mean_on, 1.0/self.mean_off)
+        # Starts in the stationary distribution
+        paused = int(rng.random() < self.pause_rate)
+        while True:
+            yield paused
+            if rng.random() < leave[paused]:
+                paused ^= 1
+
+    def __str__(self):
+        return f"markov_{self.mean_on}_{self.mean_off}"
+
+class periodic_refresh(traffic_profile):
+    # Stalls window cycles every period cycles, like a DRAM refresh
+    def __init__(self, period, window, offset=0):
+        super().__init__(0)
+        if not 0 <= window <= period:
+            raise ValueError("Refresh window must fit in the period")
+        self.period = period
+        self.window = window
+        self.offset = offset
+
+    @property
+    def pause_rate(self):
+        return self.window/self.period
+
+    def gen(self, channel):
+        seq = [0]*(self.period-self.window)+[1]*self.window
+        shift = self.offset % self.period
+        return itertools.cycle(seq[shift:]+seq[:shift])
+
+    def __str__(self):
+        return f"refresh_{self.period}_{self.window}"
+
+class overlay(traffic_profile):
+    # Pauses when any of the profiles pauses (e.g. random stalls + refresh)
+    def __init__(self, *profiles):
+        super().__init__(0)
+        self.profiles = profiles
+
+    @property
+    def pause_rate(self):
+        # Exact when the profiles are independent
+        ready = 1.0
+        for prof in self.profiles:
+            ready *= prof.bandwidth
+        return 1.0-ready
+
+    def gen(self, channel):
+        return (int(any(p)) for p in zip(*[prof(channel) for prof in self.profiles]))
+
+    def __str__(self):
+        return "+".join(str(prof) for prof in self.profiles)
+
+class trace_replay(traffic_profile):
+    """
+    Replays recorded ready (or valid) traces, 1 means the handshake signal
+    was high. trace is a sequence or a JSON file with either one list for
+    all channels or {channel: list}, channels without one use 'default'.
+    """
+    def __init__(self, trace, loop=True):
+        super().__init__(0)
+        if isinstance(trace, str):
+            with open(trace) as f:
+                trace = json.load(f)
+        if not isinstance(trace, dict):
+            trace = {'default': trace}
+        self.traces = {ch: [int(v) for v in seq] for ch, seq in trace.items()}
+        self.loop   = loop
+
+    def _trace(self, channel):
+        return self.traces.get(channel, self.traces.get('default'))
+
+    @property
+    def pause_rate(self):
+        total = sum(len(seq) for seq in self.traces.values())
+        return 1.0-(sum(sum(seq) for seq in self.traces.values())/total)
+
+    def gen(self, channel):
+        seq = self._trace(channel)
+        if seq is None:
+            raise ValueError(f"No trace recorded for channel {channel}")
+        pause = [v ^ 1 for v in seq]
+        if self.loop:
+            return itertools.cycle(pause)
+        return itertools.chain(pause, itertools.repeat(0))
+
+    def __str__(self):
+        return f"replay_{len(self.traces)}"
+
+# The 3 out of 4 pattern all the tests used to define
+cycle_pause = pattern([1, 1, 1, 0], name="cycle_pause")
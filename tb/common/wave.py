@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : wave.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import cocotb
+import logging
+from collections import deque
+from cocotb.triggers import Edge
+from cocotb.utils import get_sim_time
+from common.constants import cfg_const
+
+_AXI_M = ['awid','awaddr','awlen','awsize','awburst','awvalid','awready',
+          'wdata','wstrb','wlast','wvalid','wready',
+          'bid','bresp','bvalid','bready',
+          'arid','araddr','arlen','arsize','arburst','arvalid','arready',
+          'rid','rdata','rresp','rlast','rvalid','rready']
+_AXI_S = ['awaddr','awvalid','awready',
+          'wdata','wstrb','wvalid','wready',
+          'bresp','bvalid','bready',
+          'araddr','arvalid','arready',
+          'rdata','rresp','rvalid','rready']
+
+# scope -> [(name, path from the toplevel)]
+WAVE_SIGNALS = {
+    'top':   [(name, name) for name in ['rst','dma_done_o','dma_error_o']],
+    'dma_m': [(name, f"dma_m_{name}") for name in _AXI_M],
+    'dma_s': [(name, f"dma_s_{name}") for name in _AXI_S],
+    'fsm':   [('cur_st_ff', cfg_const.DUT_PATHS['fsm_state'])]
+}
+
+def get_handle(dut, path):
+    # Handle from a dotted path below the toplevel
+    handle = dut
+    for name in path.split('.'):
+        handle = getattr(handle, name)
+    return handle
+
+def _vcd_id(idx):
+    # Short printable identifiers, ! .. ~
+    ident = ''
+    idx  += 1
+    while idx > 0:
+        idx, rem = divmod(idx-1, 94)
+        ident   += chr(33+rem)
+    return ident
+
+class wave_ring:
+    """
+    Rolling window of the last depth cycles of a few signals, the model
+    does not need to be traced. Every signal is woken up only when it
+    changes and appends (time_ns, idx, binstr), so idle signals cost
+    nothing. Nothing is written until dump(), which produces a VCD of the
+    window starting from the values the signals held at its start.
+    """
+    def __init__(self, dut, clk_period_ns, depth=2000, signals=None):
+        self.log    = logging.getLogger("cocotb.wave_ring")
+        self.period = clk_period_ns # Updated by Tb.setup_clks
+        self.depth  = depth
+        self.events = deque() # (time_ns, idx, binstr)
+        self.vars   = [] # (scope, name, width)
+        self._sig   = []
+        for scope, sigs in (signals or WAVE_SIGNALS).items():
+            for name, path in sigs:
+                try:
+                    handle = get_handle(dut, path)
+                except AttributeError:
+                    self.log.debug("Signal %s not found, not captured", path)
+                    continue
+                self.vars.append((scope, name, len(handle)))
+                self._sig.append(handle)
+        self.dumps = []
+        self._base = [None]*len(self._sig) # Values at the start of the window
+        self._crs  = []
+
+    @property
+    def window(self):
+        return self.depth*self.period
+
+    def start(self):
+        if len(self._crs) == 0:
+            self._base = [s.value.binstr for s in self._sig]
+            self.events.clear()
+            self._crs  = [cocotb.start_soon(self._watch(idx)) for idx in range(len(self._sig))]
+
+    def stop(self):
+        for cr in self._crs:
+            cr.kill()
+        self._crs = []
+
+    def _trim(self, now):
+        # Changes older than the window become the initial values
+        events = self.events
+        start  = now-self.window
+        while events and events[0][0] < start:
+            _, idx, value = events.popleft()
+            self._base[idx] = value
+
+    async def _watch(self, idx):
+        handle = self._sig[idx]
+        edge   = Edge(handle)
+        events = self.events
+        while True:
+            await edge
+            now = get_sim_time(units='ns')
+            events.append((now, idx, handle.value.binstr))
+            if events[0][0] < now-self.window:
+                self._trim(now)
+
+    def dump(self, path, reason=None):
+        # Writes the current window, the capture keeps running afterwards
+        now    = get_sim_time(units='ns')
+        self._trim(now)
+        events = list(self.events)
+        ids    = [_vcd_id(i) for i in range(len(self.vars))]
+        with open(path, 'w') as f:
+            f.write("$comment\n  " + (reason or "wave_ring dump") +
+                    f" ({self.depth} cycles, {len(events)} changes)\n$end\n$timescale 1ns $end\n")
+            cur = None
+            for (scope, name, width), ident in zip(self.vars, ids):
+                if scope != cur:
+                    if cur is not None:
+                        f.write("$upscope $end\n")
+                    f.write(f"$scope module {scope} $end\n")
+                    cur = scope
+                f.write(f"$var wire {width} {ident} {name} $end\n")
+            if cur is not None:
+                f.write("$upscope $end\n")
+            f.write("$enddefinitions $end\n")
+            last = [None]*len(ids)
+            cur  = None
+            init = [(max(now-self.window, 0), idx, value) for idx, value in enumerate(self._base)]
+            for time, idx, value in init+events:
+                if value is None or value == last[idx]:
+                    continue
+                if time != cur:
+                    f.write(f"#{int(time)}\n")
+                    cur = time
+                last[idx] = value
+                if self.vars[idx][2] == 1:
+                    f.write(f"{value.lower()}{ids[idx]}\n")
+                else:
+                    f.write(f"b{value.lower()} {ids[idx]}\n")
+        self.dumps.append(path)
+        self.log.warning("Wave window (%d cycles) dumped to %s: %s", self.depth, path, reason)
+        return path
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : run_regression.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import os
+import sys
+import glob
+import argparse
+from common.constants import cfg_const
+from common import regression
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the DMA tests per TestFactory variant, longest first")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="Number of parallel simulations")
+    parser.add_argument("-m", "--module", action="append", help="Test module (default all test_dma_*)")
+    parser.add_argument("-f", "--flavor", action="append", help=f"Flavor (default {cfg_const.regression_setup})")
+    parser.add_argument("--list", action="store_true", help="Only print the schedule")
+    args = parser.parse_args()
+
+    modules = args.module
+    if not modules:
+        modules = sorted(os.path.splitext(os.path.basename(f))[0]
+                         for f in glob.glob(os.path.join(cfg_const.TESTS_DIR, "../test_dma_*.py")))
+
+    # Modules asked by name run even if they opt out of the regression
+    jobs = regression.get_jobs(modules, args.flavor, opt_outs=bool(args.module))
+    if args.list:
+        for job in regression.schedule(jobs, regression.load_durations()):
+            print(f"{job.estimate:8.1f}s {job}")
+        return 0
+
+    results = regression.run_regression(jobs, args.workers)
+    failed  = [(job, error) for job, error, _ in results.values() if error]
+    for job, error in failed:
+        print(f"FAILED {job}: {error}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,7 +17,8 @@ from common.constants import cfg_const
 from common.dma import dma_desc, dma_mode, dma_addr, dma_ctrl
 from common.dma import dma_error_stats, dma_err_type, dma_err_src
 from cocotb.regression import TestFactory
-from cocotb_test.simulator import run
+from common.build import run_sim
+from common.traffic import cycle_pause
 from cocotb.result import TestFailure
 from cocotb.triggers import ClockCycles, RisingEdge
 from cocotb.result import SimTimeoutError
@@ -50,16 +51,14 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
     num_bytes  = size_desc
     desc_sel   = randint(0,dma_cfg.NUM_DESC-1)
     tb.log.info("Filling up data to be transfered - (0B -> %dB)",h_mem_size)
-    tb.fill_ram([(i*bb, randint(0, max_data)) for i in range(size_desc//bb)])
+    tb.fill_ram_random(0, size_desc)
     tb.log.info("Filling up data to be overwritten - (%dB -> %dB)", h_mem_size, mem_size)
-    tb.fill_ram([(h_mem_size+i*bb, randint(0, max_data)) for i in range(size_desc//bb)])
+    tb.fill_ram_random(h_mem_size, size_desc)
     desc = []
     desc.append(dma_desc(desc_sel, src_addr, dest_addr, num_bytes, dma_mode.INCR, dma_mode.INCR, 1))
     await tb.prg_desc(desc)
     tb.log.info("Checking data mismatch prior to the DMA run")
-    for i in range(0,h_mem_size,bb):
-        tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-        assert tb.axi_ram.read(i, bb) != tb.axi_ram.read(h_mem_size+i, bb)
+    assert tb.regions_differ(0, h_mem_size, h_mem_size)
     tb.log.info("Start DMA GO")
     await tb.start_dma()
     stop_dma = randint(50,350)
@@ -80,26 +79,19 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
     num_bytes  = size_desc
     desc_sel   = randint(0,dma_cfg.NUM_DESC-1)
     tb.log.info("Filling up data to be transfered - (0B -> %dB)",h_mem_size)
-    tb.fill_ram([(i*bb, randint(0, max_data)) for i in range(size_desc//bb)])
+    tb.fill_ram_random(0, size_desc)
     tb.log.info("Filling up data to be overwritten - (%dB -> %dB)", h_mem_size, mem_size)
-    tb.fill_ram([(h_mem_size+i*bb, randint(0, max_data)) for i in range(size_desc//bb)])
+    tb.fill_ram_random(h_mem_size, size_desc)
     desc = []
     desc.append(dma_desc(desc_sel, src_addr, dest_addr, num_bytes, dma_mode.INCR, dma_mode.INCR, 1))
     await tb.prg_desc(desc)
     tb.log.info("Checking data mismatch prior to the DMA run")
-    for i in range(0,h_mem_size,bb):
-        tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-        assert tb.axi_ram.read(i, bb) != tb.axi_ram.read(h_mem_size+i, bb)
+    assert tb.regions_differ(0, h_mem_size, h_mem_size)
     tb.log.info("Start DMA GO")
     await tb.start_dma()
     await tb.wait_done()
     tb.log.info("Checking data was transfered after DMA run")
-    for i in range(0,h_mem_size,bb):
-        tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-        assert tb.axi_ram.read(i, bb) == tb.axi_ram.read(h_mem_size+i, bb)
-
-def cycle_pause():
-    return itertools.cycle([1, 1, 1, 0])
+    tb.check_regions(0, h_mem_size, h_mem_size)
 
 if cocotb.SIM_NAME:
     factory = TestFactory(test_function=run_test)
@@ -115,20 +107,4 @@ def test_dma_abort(flavor):
     Assert the abort CSR during DMA operation.
     """
     module = os.path.splitext(os.path.basename(__file__))[0]
-    SIM_BUILD = os.path.join(cfg_const.TESTS_DIR,
-            f"../../run_dir/run_{cfg_const.SIMULATOR}_{module}_{flavor}")
-    cfg_const.EXTRA_ENV['SIM_BUILD'] = SIM_BUILD
-    cfg_const.EXTRA_ENV['FLAVOR'] = flavor
-    extra_args_sim = cfg_const._get_cfg_args(flavor)
-
-    run(
-        python_search=[cfg_const.TESTS_DIR],
-        includes=cfg_const.INC_DIR,
-        verilog_sources=cfg_const.VERILOG_SOURCES,
-        toplevel=cfg_const.TOPLEVEL,
-        module=module,
-        sim_build=SIM_BUILD,
-        compile_args=cfg_const.COMPILE_ARGS,
-        extra_env=cfg_const.EXTRA_ENV,
-        extra_args=extra_args_sim
-    )
+    run_sim(module, flavor)
@@ -14,8 +14,10 @@ import pytest
 
 from common.testbench import Tb
 from common.constants import cfg_const
+from common.dma import dma_desc_table, dma_mode
 from cocotb.regression import TestFactory
-from cocotb_test.simulator import run
+from common.build import run_sim
+from common.traffic import cycle_pause
 from cocotb.result import TestFailure
 from cocotb.triggers import ClockCycles, RisingEdge
 from cocotb.result import SimTimeoutError
@@ -57,8 +59,15 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
             else:
                 assert dma_cfg.DMA_CSRs[csr][1] == rd_from_csr, "Mismatch on DMA CSR RO"
 
-def cycle_pause():
-    return itertools.cycle([1, 1, 1, 0])
+    # Whole descriptor table written as one CSR image and read back
+    table = dma_desc_table(dma_cfg.NUM_DESC)
+    for desc_id in range(dma_cfg.NUM_DESC):
+        table.set(desc_id, randrange(0, 2**32), randrange(0, 2**32), randrange(0, 2**32),
+                  random.choice(list(dma_mode)), random.choice(list(dma_mode)), randrange(0, 2))
+    req = await tb.prg_desc_table(table)
+    assert req.resp == AxiResp.OKAY, "Error while writing the descriptor table"
+    rd_table = await tb.read_desc_table()
+    assert rd_table == table, f"Mismatch on the descriptor table, desc_id {table.diff(rd_table)}"
 
 if cocotb.SIM_NAME:
     factory = TestFactory(test_function=run_test)
@@ -72,23 +81,8 @@ def test_dma_csrs(flavor):
     """
     Test ID: 1
     Description:
-    Run some simple write/read in the RW CSRs.
+    Run some simple write/read in the RW CSRs, then the whole descriptor
+    table as one CSR image.
     """
     module = os.path.splitext(os.path.basename(__file__))[0]
-    SIM_BUILD = os.path.join(cfg_const.TESTS_DIR,
-            f"../../run_dir/run_{cfg_const.SIMULATOR}_{module}_{flavor}")
-    cfg_const.EXTRA_ENV['SIM_BUILD'] = SIM_BUILD
-    cfg_const.EXTRA_ENV['FLAVOR'] = flavor
-    extra_args_sim = cfg_const._get_cfg_args(flavor)
-
-    run(
-        python_search=[cfg_const.TESTS_DIR],
-        includes=cfg_const.INC_DIR,
-        verilog_sources=cfg_const.VERILOG_SOURCES,
-        toplevel=cfg_const.TOPLEVEL,
-        module=module,
-        sim_build=SIM_BUILD,
-        compile_args=cfg_const.COMPILE_ARGS,
-        extra_env=cfg_const.EXTRA_ENV,
-        extra_args=extra_args_sim
-    )
+    run_sim(module, flavor)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : test_dma_desc_scaling.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import cocotb
+import os
+import time
+import logging
+import pytest
+
+from common.testbench import Tb
+from common.constants import cfg_const
+from common.dma import dma_desc, dma_mode
+from common.build import run_sim, get_work_dir
+from common import perf
+from cocotb.regression import TestFactory
+from cocotb.utils import get_sim_time
+
+RESULTS_FILE = "desc_scaling.json"
+TABLE_FILE   = os.path.join(cfg_const.RUN_DIR, "desc_scaling.json")
+
+def desc_gaps(bursts, base, size, num_desc):
+    """
+    Idle data cycles between consecutive descriptors on one direction, from
+    the last beat of descriptor i to the first beat of i+1. The descriptors
+    are size bytes each and packed from base, so the address tells the owner.
+    """
+    first = [None]*num_desc
+    last  = [None]*num_desc
+    for burst in bursts:
+        idx = (burst.addr-base)//size
+        if not 0 <= idx < num_desc or burst.first is None:
+            continue
+        first[idx] = burst.first if first[idx] is None else min(first[idx], burst.first)
+        last[idx]  = burst.last if last[idx] is None else max(last[idx], burst.last)
+    return [first[i+1]-last[i]-1 for i in range(num_desc-1)
+            if last[i] is not None and first[i+1] is not None]
+
+def _avg(values):
+    return sum(values)/len(values) if len(values) > 0 else 0.0
+
+async def run_test(dut, config_clk="100MHz"):
+    dma_flavor = os.getenv("FLAVOR")
+    dma_cfg = cfg_const
+    num_desc = dma_cfg.NUM_DESC
+    h_mem_size = num_desc*max(cfg_const.NDESC_XFER_SIZES)
+    mem_size = 2*h_mem_size
+
+    # Setup testbench
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_desc_scaling", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    await tb.setup_clks(config_clk)
+    await tb.rst(config_clk)
+    logging.getLogger("cocotb.dma_desc").setLevel(logging.WARNING)
+
+    #------------ Init test ------------#
+    results = {}
+
+    def cycles_since(start):
+        return int((get_sim_time(units='ns')-start)//tb.clk_period_ns)
+
+    for size in cfg_const.NDESC_XFER_SIZES:
+        tb.fill_ram_random(0, h_mem_size)
+        descs = [dma_desc(i, i*size, h_mem_size+(i*size), size, dma_mode.INCR, dma_mode.INCR, 1)
+                 for i in range(num_desc)]
+        start = get_sim_time(units='ns')
+        await tb.prg_desc(descs)
+        prg_cycles = cycles_since(start)
+        tb.set_max_burst(255)
+        tb.start_axi_monitor()
+        start = get_sim_time(units='ns')
+        await tb.start_dma()
+        await tb.wait_done()
+        run_cycles = cycles_since(start)
+        report = tb.axi_perf_report()
+        await tb.stop_dma()
+        tb.check_regions(0, h_mem_size, num_desc*size)
+
+        # Same descriptors again with the monitor off, its per cycle Python
+        # cost would hide how the simulation speed changes with N
+        tb.stop_axi_monitor()
+        tb.fill_ram_random(0, h_mem_size)
+        wall  = time.monotonic()
+        start = get_sim_time(units='ns')
+        await tb.start_dma()
+        await tb.wait_done()
+        sim_cycles = cycles_since(start)
+        wall = time.monotonic()-wall
+        await tb.stop_dma()
+        tb.check_regions(0, h_mem_size, num_desc*size)
+
+        rd_gaps = desc_gaps(report.rd_bursts, 0, size, num_desc)
+        wr_gaps = desc_gaps(report.wr_bursts, h_mem_size, size, num_desc)
+        point = f"sz{size}"
+        results[point] = {
+            'num_desc': num_desc,
+            'size': size,
+            'prg_cycles': prg_cycles,
+            'prg_cycles_per_desc': prg_cycles/num_desc,
+            'run_cycles': run_cycles,
+            'run_cycles_per_desc': run_cycles/num_desc,
+            'avg_rd_gap': _avg(rd_gaps),
+            'max_rd_gap': max(rd_gaps, default=0),
+            'avg_wr_gap': _avg(wr_gaps),
+            'max_wr_gap': max(wr_gaps, default=0),
+            'gaps_seen': min(len(rd_gaps), len(wr_gaps)),
+            'sim_cycles_per_sec': sim_cycles/wall if wall > 0 else 0.0
+        }
+        tb.log.info(f"[N={num_desc} {point}] prg {prg_cycles} cycles, run {run_cycles} cycles, "
+                    f"gap rd/wr avg {results[point]['avg_rd_gap']:.1f}/{results[point]['avg_wr_gap']:.1f} cycles, "
+                    f"{results[point]['sim_cycles_per_sec']:.0f} cycles/s")
+    perf.save_results(results, RESULTS_FILE)
+
+# Benchmark, runs on its own through tox -e scaling
+REGRESSION = False
+
+if cocotb.SIM_NAME:
+    factory = TestFactory(test_function=run_test)
+    factory.generate_tests()
+
+@pytest.mark.skipif(os.getenv("DMA_SCALING") != "1", reason="Descriptor scaling only runs with DMA_SCALING=1")
+@pytest.mark.parametrize("flavor",cfg_const.ndesc_setup)
+def test_dma_desc_scaling(flavor):
+    """
+    Test ID: 11
+    Description:
+    Rebuilds the DMA with DMA_NUM_DESC=N (CSR block scaled to match) and
+    measures the CSR programming time, the idle cycles between descriptors
+    and the simulation speed, all the N land in one table in the run dir.
+    """
+    module = os.path.splitext(os.path.basename(__file__))[0]
+    run_sim(module, flavor)
+    results = perf.load_results(get_work_dir(module, flavor), RESULTS_FILE)
+    perf.update_table(TABLE_FILE, flavor, results)
+    for point, res in results.items():
+        assert res['gaps_seen'] == res['num_desc']-1, f"{flavor}/{point}: descriptors missing on the bus"
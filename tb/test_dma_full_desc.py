@@ -17,7 +17,8 @@ from common.constants import cfg_const
 from common.dma import dma_desc, dma_mode, dma_addr, dma_ctrl
 from common.dma import dma_error_stats, dma_err_type, dma_err_src
 from cocotb.regression import TestFactory
-from cocotb_test.simulator import run
+from common.build import run_sim
+from common.traffic import cycle_pause
 from cocotb.result import TestFailure
 from cocotb.triggers import ClockCycles, RisingEdge
 from cocotb.result import SimTimeoutError
@@ -30,14 +31,15 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
     dma_cfg  = cfg_const
     # Generate random descriptor size between 2KB and 10KB
     sz_per_desc = [randint(1,4)*1024 for i in range(cfg_const.NUM_DESC)]
-    offset_wr = sum(sz_per_desc)
-    mem_size = 2*sum(sz_per_desc)
-    h_mem_size = offset_wr
+    h_mem_size = sum(sz_per_desc)
+    # Destination far from the source, anywhere in the 32-bit space
+    offset_wr = randrange(0x1000_0000, (2**32)-h_mem_size-0x1000, 0x1000)
+    mem_size = 2**32
 
     # Setup testbench
     idle = "no_idle" if idle_inserter == None else "w_idle"
     backp = "no_backpressure" if backpressure_inserter == None else "w_backpressure"
-    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_{idle}_{backp}", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_{idle}_{backp}", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size, sparse=True)
     sim_settings = tb.get_settings()
     tb.set_idle_generator(idle_inserter)
     tb.set_backpressure_generator(backpressure_inserter)
@@ -49,21 +51,20 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
     max_addr = sim_settings['max_addr']
     max_data = sim_settings['max_data']
 
-    tb.log.info("Total memory size = %d KB", mem_size//1024)
+    tb.log.info("Src = %s / Dst = %s (%d KB)", hex(0), hex(offset_wr), h_mem_size//1024)
     # Create max number of descriptors
     # and run DMA go
     desc = []
-    for index,size in enumerate(sz_per_desc):
-        src  = sum(sz_per_desc[:index])
+    offsets = itertools.accumulate(sz_per_desc, initial=0)
+    for index,(size,src) in enumerate(zip(sz_per_desc, offsets)):
         dest = offset_wr+src
         desc.append(dma_desc(index, src, dest, size, dma_mode.INCR, dma_mode.INCR, 1))
     await tb.prg_desc(desc)
     ctrl = dma_ctrl(1,0,255)
-    tb.fill_ram([(i*bb, randint(0, max_data)) for i in range(mem_size//bb)])
+    tb.fill_ram_random(0, h_mem_size)
+    tb.fill_ram_random(offset_wr, h_mem_size)
     tb.log.info("Checking data mismatch prior to the DMA run")
-    for i in range(0,h_mem_size,bb):
-        # tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-        assert tb.axi_ram.read(i, bb) != tb.axi_ram.read(h_mem_size+i, bb)
+    assert tb.regions_differ(0, offset_wr, h_mem_size)
     await tb.prg_ctrl(ctrl)
     await tb.wait_done()
 
@@ -76,17 +77,18 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
 
     # Check DMA transfer
     tb.log.info("Checking data was transfered after DMA run")
-    for i in range(0,h_mem_size,bb):
-        # tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-        assert tb.axi_ram.read(i, bb) == tb.axi_ram.read(h_mem_size+i, bb)
+    tb.check_regions(0, offset_wr, h_mem_size)
+    assert tb.ram_usage()['resident_bytes'] <= 2*(h_mem_size+0x1000)
 
-def cycle_pause():
-    return itertools.cycle([1, 1, 1, 0])
+# Also read by the regression runner to schedule each variant on its own
+FACTORY_OPTS = {}
+FACTORY_OPTS["idle_inserter"] = [None, cycle_pause]
+FACTORY_OPTS["backpressure_inserter"] = [None, cycle_pause]
 
 if cocotb.SIM_NAME:
     factory = TestFactory(test_function=run_test)
-    factory.add_option("idle_inserter", [None, cycle_pause])
-    factory.add_option("backpressure_inserter", [None, cycle_pause])
+    for option, values in FACTORY_OPTS.items():
+        factory.add_option(option, values)
     factory.generate_tests()
 
 @pytest.mark.parametrize("flavor",cfg_const.regression_setup)
@@ -97,20 +99,4 @@ def test_dma_full_desc(flavor):
     Programs all descriptors with different addresses.
     """
     module = os.path.splitext(os.path.basename(__file__))[0]
-    SIM_BUILD = os.path.join(cfg_const.TESTS_DIR,
-            f"../../run_dir/run_{cfg_const.SIMULATOR}_{module}_{flavor}")
-    cfg_const.EXTRA_ENV['SIM_BUILD'] = SIM_BUILD
-    cfg_const.EXTRA_ENV['FLAVOR'] = flavor
-    extra_args_sim = cfg_const._get_cfg_args(flavor)
-
-    run(
-        python_search=[cfg_const.TESTS_DIR],
-        includes=cfg_const.INC_DIR,
-        verilog_sources=cfg_const.VERILOG_SOURCES,
-        toplevel=cfg_const.TOPLEVEL,
-        module=module,
-        sim_build=SIM_BUILD,
-        compile_args=cfg_const.COMPILE_ARGS,
-        extra_env=cfg_const.EXTRA_ENV,
-        extra_args=extra_args_sim
-    )
+    run_sim(module, flavor)
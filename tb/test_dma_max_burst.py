@@ -17,7 +17,8 @@ from common.constants import cfg_const
 from common.dma import dma_desc, dma_mode, dma_addr, dma_ctrl
 from common.dma import dma_error_stats, dma_err_type, dma_err_src
 from cocotb.regression import TestFactory
-from cocotb_test.simulator import run
+from common.build import run_sim
+from common.traffic import cycle_pause
 from cocotb.result import TestFailure
 from cocotb.triggers import ClockCycles, RisingEdge
 from cocotb.result import SimTimeoutError
@@ -26,7 +27,7 @@ from random import randrange, randint
 from cocotbext.axi import AxiBus, AxiLiteBus, AxiMaster, AxiRam, AxiResp, AxiLiteMaster, AxiSlave
 import itertools
 
-async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_inserter=None):
+async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_inserter=None, bursts=range(256)):
     dma_flavor = os.getenv("FLAVOR")
     dma_cfg = cfg_const
     mem_size = 8*1024 #8KB
@@ -34,7 +35,7 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
     # Setup testbench
     idle = "no_idle" if idle_inserter == None else "w_idle"
     backp = "no_backpressure" if backpressure_inserter == None else "w_backpressure"
-    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_{idle}_{backp}", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_{idle}_{backp}_b{bursts.start}_{bursts.stop-1}", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
     sim_settings = tb.get_settings()
     tb.set_idle_generator(idle_inserter)
     tb.set_backpressure_generator(backpressure_inserter)
@@ -43,8 +44,11 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
 
     #------------ Init test ------------#
     desc_sel = randint(0,dma_cfg.NUM_DESC-1)
+    perf = {}
+    tb.fill_ram_random(0, mem_size)
+    ram_snap = tb.snapshot_ram()
 
-    for burst_sz in range(256):
+    for burst_sz in bursts:
         start_sim_time = get_sim_time(units='ns')
         bb         = sim_settings['bb']
         max_data   = sim_settings['max_data']
@@ -53,38 +57,40 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
         src_addr   = 0
         dest_addr  = h_mem_size
         num_bytes  = size_desc
-        tb.fill_ram([(i*bb, randint(0, max_data)) for i in range(size_desc//bb)])
-        tb.fill_ram([(h_mem_size+i*bb, randint(0, max_data)) for i in range(size_desc//bb)])
+        tb.restore_ram(ram_snap)
         desc = []
         desc.append(dma_desc(desc_sel, src_addr, dest_addr, num_bytes, dma_mode.INCR, dma_mode.INCR, 1))
         await tb.prg_desc(desc)
         tb.log.info("Checking data mismatch prior to the DMA run")
-        for i in range(0,h_mem_size,bb):
-            # tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-            assert tb.axi_ram.read(i, bb) != tb.axi_ram.read(h_mem_size+i, bb)
+        assert tb.regions_differ(0, h_mem_size, h_mem_size)
         tb.log.info("Start DMA GO")
         tb.set_max_burst(burst_sz)
         tb.log.info("Max burst cfg: %d", burst_sz)
+        tb.start_axi_monitor()
         await tb.start_dma()
         await tb.wait_done()
         end_sim_time = get_sim_time(units='ns')
+        report = tb.axi_perf_report()
         await tb.stop_dma()
         tb.log.info("Checking data was transfered after DMA run")
         delta = end_sim_time-start_sim_time
-        bw = ((h_mem_size/1024)/1024)/(delta*(10**-9))
         tb.log.info(f"Sim time in ns: {delta} ns")
-        tb.log.info(f"Throughput: {bw} MiB/s")
-        for i in range(0,h_mem_size,bb):
-            # tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-            assert tb.axi_ram.read(i, bb) == tb.axi_ram.read(h_mem_size+i, bb)
+        tb.log.info(f"Throughput (bus): {report.mib_s} MiB/s")
+        perf[burst_sz] = report.to_dict(with_bursts=False)
+        tb.check_regions(0, h_mem_size, h_mem_size)
+    tb.dump_json("axi_perf_max_burst", perf)
 
-def cycle_pause():
-    return itertools.cycle([1, 1, 1, 0])
+# The 256 max burst values are split in chunks so the regression runner
+# can schedule them as independent jobs
+FACTORY_OPTS = {}
+FACTORY_OPTS["bursts"] = [range(i, i+64) for i in range(0, 256, 64)]
 
 if cocotb.SIM_NAME:
     factory = TestFactory(test_function=run_test)
     # factory.add_option("idle_inserter", [None, cycle_pause])
     # factory.add_option("backpressure_inserter", [None, cycle_pause])
+    for option, values in FACTORY_OPTS.items():
+        factory.add_option(option, values)
     factory.generate_tests()
 
 @pytest.mark.parametrize("flavor",cfg_const.regression_setup)
@@ -95,20 +101,4 @@ def test_dma_max_burst(flavor):
     Configures all possible bursts through the DMA.
     """
     module = os.path.splitext(os.path.basename(__file__))[0]
-    SIM_BUILD = os.path.join(cfg_const.TESTS_DIR,
-            f"../../run_dir/run_{cfg_const.SIMULATOR}_{module}_{flavor}")
-    cfg_const.EXTRA_ENV['SIM_BUILD'] = SIM_BUILD
-    cfg_const.EXTRA_ENV['FLAVOR'] = flavor
-    extra_args_sim = cfg_const._get_cfg_args(flavor)
-
-    run(
-        python_search=[cfg_const.TESTS_DIR],
-        includes=cfg_const.INC_DIR,
-        verilog_sources=cfg_const.VERILOG_SOURCES,
-        toplevel=cfg_const.TOPLEVEL,
-        module=module,
-        sim_build=SIM_BUILD,
-        compile_args=cfg_const.COMPILE_ARGS,
-        extra_env=cfg_const.EXTRA_ENV,
-        extra_args=extra_args_sim
-    )
+    run_sim(module, flavor)
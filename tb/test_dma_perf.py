@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : test_dma_perf.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import random
+import cocotb
+import os
+import logging
+import pytest
+
+from common.testbench import Tb
+from common.constants import cfg_const
+from common.dma import dma_desc, dma_mode, dma_addr, dma_ctrl
+from common.build import run_sim, get_work_dir
+from common import perf
+from cocotb.regression import TestFactory
+from cocotb.utils import get_sim_time
+from random import randrange, randint
+import itertools
+
+async def run_test(dut, config_clk="100MHz"):
+    dma_flavor = os.getenv("FLAVOR")
+    dma_cfg = cfg_const
+    h_mem_size = max(cfg_const.PERF_XFER_SIZES)+4096
+    mem_size = 2*h_mem_size
+
+    # Setup testbench
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_perf", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    sim_settings = tb.get_settings()
+    await tb.setup_clks(config_clk)
+    await tb.rst(config_clk)
+
+    #------------ Init test ------------#
+    bb       = sim_settings['bb']
+    desc_sel = randint(0,dma_cfg.NUM_DESC-1)
+    results  = {}
+
+    for size, align, maxb in itertools.product(cfg_const.PERF_XFER_SIZES,
+                                               cfg_const.PERF_XFER_ALIGN,
+                                               cfg_const.PERF_MAX_BURST):
+        src_addr  = align
+        dest_addr = h_mem_size+align
+        tb.fill_ram_random(0, h_mem_size)
+        desc = []
+        desc.append(dma_desc(desc_sel, src_addr, dest_addr, size, dma_mode.INCR, dma_mode.INCR, 1))
+        await tb.prg_desc(desc)
+        tb.set_max_burst(maxb)
+        tb.start_axi_monitor()
+        tb.start_occupancy()
+        start_sim_time = get_sim_time(units='ns')
+        await tb.start_dma()
+        await tb.wait_done()
+        end_sim_time = get_sim_time(units='ns')
+        report = tb.axi_perf_report()
+        occup  = tb.occupancy_report()
+        await tb.stop_dma()
+
+        # Unaligned heads are only moved from the next aligned bus word
+        next_aligned_addr = (src_addr+bb-1) & ~(bb-1)
+        last_aligned_addr = (src_addr+size) & ~(bb-1)
+        tb.check_regions(next_aligned_addr, h_mem_size+next_aligned_addr, last_aligned_addr-next_aligned_addr)
+
+        # Compared on the dma_m bus window (first handshake to the last B),
+        # the end to end time also has the GO write and the done detection
+        cycles = (end_sim_time-start_sim_time)/tb.clk_period_ns
+        point  = f"sz{size}_al{align}_mb{maxb}"
+        results[point] = {
+            'mib_s': report.mib_s,
+            'cycles_per_byte': report.cycles/size,
+            'bus_bytes_per_cycle': report.bytes_cycle,
+            'e2e_mib_s': (size/(1024*1024))/((end_sim_time-start_sim_time)*(10**-9)),
+            'e2e_cycles_per_byte': cycles/size,
+            'fifo_full_pct': occup['fifo'].get('full_pct', 0.0),
+            'fifo_empty_pct': occup['fifo'].get('empty_pct', 0.0),
+            'max_rd_pend': occup['rd_pend'].get('max', 0),
+            'max_wr_pend': occup['wr_pend'].get('max', 0)
+        }
+        tb.log.info(f"[{point}] bus {results[point]['mib_s']:.2f} MiB/s / {results[point]['cycles_per_byte']:.3f} cycles/B, "
+                    f"end to end {results[point]['e2e_mib_s']:.2f} MiB/s")
+    perf.save_results(results)
+
+# Perf sweep, runs on its own through tox -e perf
+REGRESSION = False
+
+if cocotb.SIM_NAME:
+    factory = TestFactory(test_function=run_test)
+    factory.generate_tests()
+
+@pytest.mark.skipif(os.getenv("DMA_PERF") != "1", reason="Perf sweep only runs with DMA_PERF=1")
+@pytest.mark.parametrize("flavor",cfg_const.perf_setup)
+def test_dma_perf(flavor):
+    """
+    Test ID: 9
+    Description:
+    Sweeps RTL defines, transfer sizes, alignments and max bursts and
+    checks the bus throughput against the stored baseline, points with
+    no baseline are skipped.
+    """
+    module = os.path.splitext(os.path.basename(__file__))[0]
+    run_sim(module, flavor)
+    results = perf.load_results(get_work_dir(module, flavor))
+    regressions, missing = perf.check_baseline(flavor, results)
+    assert len(regressions) == 0, "Throughput regressions:\n"+"\n".join(regressions)
+    if len(missing) > 0:
+        pytest.skip(f"{flavor}: {len(missing)} points with no baseline ({', '.join(missing[:3])}...), "
+                    f"record it with DMA_PERF_UPDATE=1")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : test_dma_ring.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import cocotb
+import os
+import logging
+import pytest
+
+from common.testbench import Tb
+from common.constants import cfg_const
+from common.dma import dma_xfer
+from common.build import run_sim
+from common.traffic import cycle_pause
+from cocotb.regression import TestFactory
+from random import randrange, randint
+
+NUM_JOBS      = 12
+MAX_XFERS     = 4
+MAX_XFER_SIZE = 4096
+CHUNK_SIZE    = 1024 # Forces the longer transfers to take several slots
+
+async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_inserter=None):
+    dma_flavor = os.getenv("FLAVOR")
+    dma_cfg = cfg_const
+    src_size = 16*1024
+    mem_size = src_size+(NUM_JOBS*MAX_XFERS*MAX_XFER_SIZE)
+
+    # Setup testbench
+    idle = "no_idle" if idle_inserter == None else "w_idle"
+    backp = "no_backpressure" if backpressure_inserter == None else "w_backpressure"
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_{idle}_{backp}", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    sim_settings = tb.get_settings()
+    tb.set_idle_generator(idle_inserter)
+    tb.set_backpressure_generator(backpressure_inserter)
+    await tb.setup_clks(config_clk)
+    await tb.rst(config_clk)
+    logging.getLogger("cocotb.dma_desc").setLevel(logging.WARNING)
+
+    #------------ Init test ------------#
+    bb = sim_settings['bb']
+    tb.fill_ram_random(0, src_size)
+    dst_slot = src_size
+    jobs     = []
+
+    def gen_job():
+        # Sources anywhere (may overlap), every destination in its own slot
+        nonlocal dst_slot
+        xfers = []
+        for _ in range(randint(1, MAX_XFERS)):
+            nbytes = randrange(bb, MAX_XFER_SIZE+1, bb)
+            xfers.append(dma_xfer(randrange(0, src_size-nbytes+1, bb), dst_slot, nbytes))
+            dst_slot += MAX_XFER_SIZE
+        return xfers
+
+    # Half of the jobs queued upfront, the rest while the DMA is running
+    for _ in range(NUM_JOBS//2):
+        jobs.append(tb.submit(gen_job(), max_desc_bytes=CHUNK_SIZE))
+    await jobs[0]
+    for _ in range(NUM_JOBS-(NUM_JOBS//2)):
+        jobs.append(tb.submit(gen_job()))
+    await tb.ring.drain()
+
+    for job in jobs:
+        tb.log.info("%s", job)
+        assert job.error == 0, f"DMA error on {job}"
+        for xfer in job.xfers:
+            tb.check_regions(xfer.src, xfer.dst, xfer.nbytes)
+    report = tb.ring.report()
+    tb.log.info("[Ring] %d jobs in %d runs, %.3f B/cycle, gap between runs avg %.1f cycles, latency avg %.1f cycles",
+                report['jobs'], report['runs'], report['bytes_per_cycle'], report['avg_gap'], report['avg_latency'])
+    tb.dump_json("ring", report)
+    tb.ring.stop()
+
+FACTORY_OPTS = {}
+FACTORY_OPTS["idle_inserter"] = [None, cycle_pause]
+FACTORY_OPTS["backpressure_inserter"] = [None, cycle_pause]
+
+if cocotb.SIM_NAME:
+    factory = TestFactory(test_function=run_test)
+    for option, values in FACTORY_OPTS.items():
+        factory.add_option(option, values)
+    factory.generate_tests()
+
+@pytest.mark.parametrize("flavor",cfg_const.regression_setup)
+def test_dma_ring(flavor):
+    """
+    Test ID: 13
+    Description:
+    Submits jobs of several transfers through Tb.submit, part of them
+    while the DMA is running, and checks every transfer once the
+    descriptor ring drains, logging the throughput and job latencies.
+    """
+    module = os.path.splitext(os.path.basename(__file__))[0]
+    run_sim(module, flavor)
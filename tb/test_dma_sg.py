@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : test_dma_sg.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import cocotb
+import os
+import logging
+import pytest
+
+from common.testbench import Tb
+from common.constants import cfg_const
+from common.dma import dma_desc, dma_mode, sg_plan, sg_check, sg_rounds
+from common.build import run_sim
+from common.traffic import cycle_pause
+from cocotb.regression import TestFactory
+from random import randrange, randint
+
+SG_SIZE      = 16*1024
+MIN_FRAG     = 256
+MAX_FRAG     = 3*1024
+MAX_GAP      = 512
+MAX_DESC_SZ  = 2048 # Forces the bigger runs to be split
+
+def gen_frags(base, total, bb):
+    # total bytes in bus aligned fragments, some of them back to back
+    frags, addr = [], base
+    while total > 0:
+        nbytes = min(total, randrange(MIN_FRAG, MAX_FRAG+1, bb))
+        frags.append((addr, nbytes))
+        addr  += nbytes+(0 if randint(0, 3) == 0 else randrange(bb, MAX_GAP+1, bb))
+        total -= nbytes
+    return frags, addr
+
+async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_inserter=None):
+    dma_flavor = os.getenv("FLAVOR")
+    dma_cfg = cfg_const
+    # Worst case every fragment followed by the largest gap
+    h_mem_size = SG_SIZE+((SG_SIZE//MIN_FRAG)*MAX_GAP)
+    mem_size = 2*h_mem_size
+
+    # Setup testbench
+    idle = "no_idle" if idle_inserter == None else "w_idle"
+    backp = "no_backpressure" if backpressure_inserter == None else "w_backpressure"
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_{idle}_{backp}", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    sim_settings = tb.get_settings()
+    tb.set_idle_generator(idle_inserter)
+    tb.set_backpressure_generator(backpressure_inserter)
+    await tb.setup_clks(config_clk)
+    await tb.rst(config_clk)
+    logging.getLogger("cocotb.dma_desc").setLevel(logging.WARNING)
+
+    #------------ Init test ------------#
+    bb = sim_settings['bb']
+    src_frags, src_end = gen_frags(0, SG_SIZE, bb)
+    dst_frags, _ = gen_frags(h_mem_size, SG_SIZE, bb)
+    tb.fill_ram_random(0, src_end)
+
+    xfers = sg_plan(src_frags, dst_frags, dma_flavor, MAX_DESC_SZ)
+    errors = sg_check(xfers, src_frags, dst_frags, dma_flavor, MAX_DESC_SZ)
+    assert len(errors) == 0, "\n".join(errors)
+    rounds = sg_rounds(xfers, dma_cfg.NUM_DESC)
+    tb.log.info("%d src / %d dst fragments -> %d descriptors in %d rounds",
+                len(src_frags), len(dst_frags), len(xfers), len(rounds))
+
+    for descs in rounds:
+        # Slots left over from a longer round go disabled
+        idle_slots = [dma_desc(slot, 0, 0, 0, dma_mode.INCR, dma_mode.INCR, 0)
+                      for slot in range(len(descs), dma_cfg.NUM_DESC)]
+        await tb.prg_desc(descs+idle_slots)
+        await tb.start_dma()
+        await tb.wait_done()
+        await tb.stop_dma()
+
+    # The gathered source has to land scattered in the same byte order
+    src = b"".join(bytes(tb.ram_view(addr, nbytes)) for addr, nbytes in src_frags)
+    dst = b"".join(bytes(tb.ram_view(addr, nbytes)) for addr, nbytes in dst_frags)
+    assert src == dst, "Scatter-gather data mismatch"
+
+FACTORY_OPTS = {}
+FACTORY_OPTS["idle_inserter"] = [None, cycle_pause]
+FACTORY_OPTS["backpressure_inserter"] = [None, cycle_pause]
+
+if cocotb.SIM_NAME:
+    factory = TestFactory(test_function=run_test)
+    for option, values in FACTORY_OPTS.items():
+        factory.add_option(option, values)
+    factory.generate_tests()
+
+@pytest.mark.parametrize("flavor",cfg_const.regression_setup)
+def test_dma_sg(flavor):
+    """
+    Test ID: 14
+    Description:
+    Random source and destination fragment lists planned with sg_plan,
+    checked with sg_check and run in NUM_DESC sized rounds, the gathered
+    source has to match the scattered destination byte by byte.
+    """
+    module = os.path.splitext(os.path.basename(__file__))[0]
+    run_sim(module, flavor)
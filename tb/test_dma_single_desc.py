@@ -15,7 +15,9 @@ import pytest
 from common.testbench import Tb
 from common.constants import cfg_const
 from cocotb.regression import TestFactory
-from cocotb_test.simulator import run
+from common.build import run_sim
+from common.traffic import cycle_pause, markov_onoff
+from common.memory import build_image
 from cocotb.result import TestFailure
 from cocotb.triggers import ClockCycles, RisingEdge
 from cocotb.result import SimTimeoutError
@@ -25,15 +27,27 @@ from common.dma import dma_desc, dma_mode, dma_addr, dma_ctrl
 from common.dma import dma_error_stats, dma_err_type, dma_err_src
 import itertools
 
-async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_inserter=None):
+def min_latency(spec):
+    # Lowest cycles a MEM_PROFILES latency can sample
+    if isinstance(spec, int):
+        return spec
+    if isinstance(spec, tuple):
+        return spec[0]
+    return min(lat for lat, _ in spec)
+
+async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_inserter=None, mem_model=None):
     dma_flavor = os.getenv("FLAVOR")
     dma_cfg = cfg_const
     mem_size = 8*1024 #8KB
+    # Random image built once and shared (copy on write) by all the variants and runs
+    image = build_image(mem_size, cfg_const.IMAGE_SEED)
 
     # Setup testbench
     idle = "no_idle" if idle_inserter == None else "w_idle"
     backp = "no_backpressure" if backpressure_inserter == None else "w_backpressure"
-    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_{idle}_{backp}", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    mem = "ram" if mem_model == None else mem_model
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_{idle}_{backp}_{mem}", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size,
+            ram_image=image, mem_model=mem_model)
     sim_settings = tb.get_settings()
     tb.set_idle_generator(idle_inserter)
     tb.set_backpressure_generator(backpressure_inserter)
@@ -49,32 +63,45 @@ async def run_test(dut, config_clk="100MHz", idle_inserter=None, backpressure_in
     dest_addr  = h_mem_size
     num_bytes  = size_desc
     desc_sel   = randint(0,dma_cfg.NUM_DESC-1)
-    tb.log.info("Filling up data to be transfered - (0B -> %dB)",h_mem_size)
-    tb.fill_ram([(i*bb, randint(0, max_data)) for i in range(size_desc//bb)])
-    tb.log.info("Filling up data to be overwritten - (%dB -> %dB)", h_mem_size, mem_size)
-    tb.fill_ram([(h_mem_size+i*bb, randint(0, max_data)) for i in range(size_desc//bb)])
+    tb.log.info("Using prefilled image %s - (0B -> %dB)", image, mem_size)
     desc = []
     desc.append(dma_desc(desc_sel, src_addr, dest_addr, num_bytes, dma_mode.INCR, dma_mode.INCR, 1))
     await tb.prg_desc(desc)
     tb.log.info("Checking data mismatch prior to the DMA run")
-    for i in range(0,h_mem_size,bb):
-        tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-        assert tb.axi_ram.read(i, bb) != tb.axi_ram.read(h_mem_size+i, bb)
+    assert tb.regions_differ(0, h_mem_size, h_mem_size)
+    tb.start_axi_monitor()
+    tb.start_occupancy()
     tb.log.info("Start DMA GO")
     await tb.start_dma()
     await tb.wait_done()
+    report = tb.axi_perf_report()
+    tb.occupancy_report("transfer")
     tb.log.info("Checking data was transfered after DMA run")
-    for i in range(0,h_mem_size,bb):
-        tb.log.debug("%s", tb.axi_ram.hexdump_str(h_mem_size+i,bb))
-        assert tb.axi_ram.read(i, bb) == tb.axi_ram.read(h_mem_size+i, bb)
+    tb.check_regions(0, h_mem_size, h_mem_size)
+    if backpressure_inserter is not None:
+        # W beats can not beat the WREADY bandwidth of the profile
+        assert report.wr_util <= backpressure_inserter.bandwidth+0.08, \
+               f"W utilisation {report.wr_util:.2%} above the {backpressure_inserter} bandwidth"
+    if mem_model is not None:
+        # The timing model has to overlap reads and its latency be seen on the bus
+        mem_report = tb.axi_ram.report()
+        tb.log.info("[%s] %s / rd latency %s cycles", mem_model, mem_report, report.rd_latency)
+        assert mem_report['max_rd_outstanding'] > 1, f"{mem_model}: reads never overlapped {mem_report}"
+        assert report.rd_latency['avg'] >= min_latency(cfg_const.MEM_PROFILES[mem_model]['rd_latency']), \
+               f"{mem_model}: rd latency {report.rd_latency} below the profile"
 
-def cycle_pause():
-    return itertools.cycle([1, 1, 1, 0])
+# Also read by the regression runner to schedule each variant on its own
+FACTORY_OPTS = {}
+FACTORY_OPTS["idle_inserter"] = [None, cycle_pause]
+# Same 75% stall rate as cycle_pause but in correlated bursts
+FACTORY_OPTS["backpressure_inserter"] = [None, markov_onoff(mean_on=2, mean_off=6)]
+# Zero latency AxiRam and the axi_mem_slave timing models
+FACTORY_OPTS["mem_model"] = [None, "sram_ic", "ddr"]
 
 if cocotb.SIM_NAME:
     factory = TestFactory(test_function=run_test)
-    factory.add_option("idle_inserter", [None, cycle_pause])
-    factory.add_option("backpressure_inserter", [None, cycle_pause])
+    for option, values in FACTORY_OPTS.items():
+        factory.add_option(option, values)
     factory.generate_tests()
 
 @pytest.mark.parametrize("flavor",cfg_const.regression_setup)
@@ -82,23 +109,8 @@ def test_dma_single_desc(flavor):
     """
     Test ID: 2
     Description:
-    Move 4KB of data using a single descriptor.
+    Move 4KB of data using a single descriptor, also through the
+    sram_ic/ddr memory timing models.
     """
     module = os.path.splitext(os.path.basename(__file__))[0]
-    SIM_BUILD = os.path.join(cfg_const.TESTS_DIR,
-            f"../../run_dir/run_{cfg_const.SIMULATOR}_{module}_{flavor}")
-    cfg_const.EXTRA_ENV['SIM_BUILD'] = SIM_BUILD
-    cfg_const.EXTRA_ENV['FLAVOR'] = flavor
-    extra_args_sim = cfg_const._get_cfg_args(flavor)
-
-    run(
-        python_search=[cfg_const.TESTS_DIR],
-        includes=cfg_const.INC_DIR,
-        verilog_sources=cfg_const.VERILOG_SOURCES,
-        toplevel=cfg_const.TOPLEVEL,
-        module=module,
-        sim_build=SIM_BUILD,
-        compile_args=cfg_const.COMPILE_ARGS,
-        extra_env=cfg_const.EXTRA_ENV,
-        extra_args=extra_args_sim
-    )
+    run_sim(module, flavor)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : test_dma_small_xfer.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import cocotb
+import os
+import logging
+import itertools
+import pytest
+
+from common.testbench import Tb
+from common.constants import cfg_const
+from common.dma import dma_desc, dma_mode
+from common.build import run_sim, get_work_dir, get_build_hash
+from common import perf
+from cocotb.regression import TestFactory
+
+RESULTS_FILE = "small_xfer.json"
+TABLE_FILE   = os.path.join(cfg_const.RUN_DIR, "small_xfer_latency.json")
+TABLE_CSV    = os.path.join(cfg_const.RUN_DIR, "small_xfer_latency.csv")
+
+async def run_test(dut, config_clk="100MHz"):
+    dma_flavor = os.getenv("FLAVOR")
+    dma_cfg = cfg_const
+    h_mem_size = 4096
+    mem_size = 2*h_mem_size
+
+    # Setup testbench
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_small_xfer", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    sim_settings = tb.get_settings()
+    await tb.setup_clks(config_clk)
+    await tb.rst(config_clk)
+    logging.getLogger("cocotb.dma_desc").setLevel(logging.WARNING)
+
+    #------------ Init test ------------#
+    bb = sim_settings['bb']
+    en_unaligned = cfg_const._get_cfg(dma_flavor).get('dma_en_unaligned', cfg_const.DMA_RTL_DEFAULTS['dma_en_unaligned'])
+    aligns  = [al for al in cfg_const.SMALL_XFER_ALIGN if al < bb and (en_unaligned or al == 0)]
+    results = {}
+
+    for size, align in itertools.product(cfg_const.SMALL_XFER_SIZES, aligns):
+        src_addr  = align
+        dest_addr = h_mem_size+align
+        tb.fill_ram_random(0, h_mem_size)
+        desc = [dma_desc(0, src_addr, dest_addr, size, dma_mode.INCR, dma_mode.INCR, 1)]
+        # Every timestamp in cycles of the dma_m monitor
+        tb.start_axi_monitor()
+        mon = tb.axi_mon
+        t_prg = mon.cycle
+        await tb.prg_desc(desc)
+        await tb.start_dma()
+        t_go = mon.cycle
+        await tb.wait_done()
+        t_done = mon.cycle
+        report = tb.axi_perf_report()
+        await tb.stop_dma()
+
+        # Unaligned heads are only moved from the next aligned bus word
+        next_aligned_addr = (src_addr+bb-1) & ~(bb-1)
+        last_aligned_addr = (src_addr+size) & ~(bb-1)
+        tb.check_regions(next_aligned_addr, h_mem_size+next_aligned_addr, last_aligned_addr-next_aligned_addr)
+
+        first_ar = min(b.issue for b in report.rd_bursts)
+        last_b   = max(b.resp for b in report.wr_bursts if b.resp is not None)
+        point = f"sz{size}_al{align}"
+        results[point] = {
+            'size': size,
+            'align': align,
+            'rd_bursts': len(report.rd_bursts),
+            'wr_bursts': len(report.wr_bursts),
+            'prg_to_go': t_go-t_prg,
+            'go_to_first_ar': first_ar-t_go,
+            'first_ar_to_last_b': last_b-first_ar,
+            'last_b_to_done': t_done-last_b,
+            'total': t_done-t_prg
+        }
+        tb.log.info(f"[{point}] prg->go {results[point]['prg_to_go']} / go->AR {results[point]['go_to_first_ar']} / "
+                    f"AR->last B {results[point]['first_ar_to_last_b']} / last B->done {results[point]['last_b_to_done']} cycles")
+    perf.save_results(results, RESULTS_FILE)
+
+# Benchmark, runs on its own through tox -e latency
+REGRESSION = False
+
+if cocotb.SIM_NAME:
+    factory = TestFactory(test_function=run_test)
+    factory.generate_tests()
+
+@pytest.mark.skipif(os.getenv("DMA_LATENCY") != "1", reason="Small transfer latency only runs with DMA_LATENCY=1")
+@pytest.mark.parametrize("flavor",cfg_const.regression_setup)
+def test_dma_small_xfer(flavor):
+    """
+    Test ID: 12
+    Description:
+    Single descriptor transfers of 64B-512B over a few alignments, split
+    in cycles of: CSR programming up to GO, GO to the first AR, first AR
+    to the last B and last B to dma_done_o. Every flavor lands in one
+    JSON/CSV table in the run dir, tagged with the model build hash.
+    """
+    module = os.path.splitext(os.path.basename(__file__))[0]
+    run_sim(module, flavor)
+    results = perf.load_results(get_work_dir(module, flavor), RESULTS_FILE)
+    build = get_build_hash(flavor)[:16]
+    for res in results.values():
+        res['build'] = build
+    perf.update_table(TABLE_FILE, flavor, results, TABLE_CSV)
+    for point, res in results.items():
+        assert res['go_to_first_ar'] >= 0 and res['last_b_to_done'] >= 0, f"{flavor}/{point}: phases out of order {res}"
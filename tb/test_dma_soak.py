@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File              : test_dma_soak.py
+# License           : MIT license <Check LICENSE>
+# Author            : Anderson Ignacio da Silva (aignacio) <anderson@aignacio.com>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+import random
+import cocotb
+import os
+import time
+import math
+import logging
+import pytest
+
+from common.testbench import Tb
+from common.constants import cfg_const
+from common.dma import dma_desc, dma_desc_table, dma_mode, dma_addr, dma_ctrl
+from common.build import run_sim
+from cocotb.regression import TestFactory
+from cocotb.utils import get_sim_time
+from random import randrange, randint, choice
+
+def gen_batch(bb, mem_size, num_desc, en_unaligned):
+    """
+    Random descriptors for one DMA run. Sources are picked anywhere in the
+    lower half so they may overlap each other, destinations get a slot of
+    the upper half each so the descriptors of a batch never step on a
+    source or on each other (the reference model needs that).
+    """
+    h_mem_size = mem_size//2
+    slot       = (h_mem_size//num_desc) & ~(bb-1)
+    descs      = []
+    for desc_id in range(num_desc):
+        if randint(0, 3) == 0:
+            descs.append(dma_desc(desc_id, 0, 0, 0, dma_mode.INCR, dma_mode.INCR, 0))
+            continue
+        rd_m = choice([dma_mode.INCR, dma_mode.INCR, dma_mode.FIXED])
+        wr_m = choice([dma_mode.INCR, dma_mode.INCR, dma_mode.FIXED])
+        # Log uniform sizes, a lot of short ones and a few long ones
+        nbytes = int(2**random.uniform(math.log2(bb), math.log2(slot-bb)))
+        offset = 0
+        if en_unaligned and rd_m == dma_mode.INCR and wr_m == dma_mode.INCR and randint(0, 1):
+            # The DMA does not realign, src and dst keep the same offset
+            offset = randint(1, bb-1)
+        else:
+            nbytes &= ~(bb-1)
+        src = randrange(0, h_mem_size-nbytes-bb, bb)+offset
+        dst = h_mem_size+(desc_id*slot)+offset
+        descs.append(dma_desc(desc_id, src, dst, nbytes, wr_m, rd_m, 1))
+    if all(desc.en == 0 for desc in descs):
+        return gen_batch(bb, mem_size, num_desc, en_unaligned)
+    return descs
+
+async def run_test(dut, config_clk="100MHz"):
+    dma_flavor = os.getenv("FLAVOR")
+    dma_cfg = cfg_const
+    mem_size = cfg_const.SOAK_MEM_SIZE
+
+    # Setup testbench
+    tb = Tb(dut=dut, log_name=f"sim_{config_clk}_soak", cfg=dma_cfg, flavor=dma_flavor, ram_size=mem_size)
+    sim_settings = tb.get_settings()
+    await tb.setup_clks(config_clk)
+    await tb.rst(config_clk)
+    # Descriptor logs would flood the log file over millions of cycles
+    logging.getLogger("cocotb.dma_desc").setLevel(logging.WARNING)
+
+    #------------ Init test ------------#
+    bb           = sim_settings['bb']
+    en_unaligned = cfg_const._get_cfg(dma_flavor).get('dma_en_unaligned', cfg_const.DMA_RTL_DEFAULTS['dma_en_unaligned'])
+    tb.fill_ram_random(0, mem_size)
+    wall_start   = time.monotonic()
+    sim_start    = get_sim_time(units='ns')
+    win_start    = sim_start
+    win_bytes    = 0
+    total_bytes  = 0
+    batches      = 0
+    windows      = []
+
+    def cycles_since(start):
+        return int((get_sim_time(units='ns')-start)//tb.clk_period_ns)
+
+    while (cycles_since(sim_start) < cfg_const.SOAK_CYCLES and
+           time.monotonic()-wall_start < cfg_const.SOAK_WALL_SECS):
+        descs = gen_batch(bb, mem_size, dma_cfg.NUM_DESC, en_unaligned)
+        # New data in the sources touched, the rest keeps the previous runs
+        for desc in descs:
+            if desc.en and desc.rd_m == dma_mode.INCR:
+                tb.fill_ram_random(desc.src, desc.nbytes)
+        await tb.prg_desc_table(dma_desc_table.from_descs(descs, dma_cfg.NUM_DESC))
+        tb.set_max_burst(choice([0, randint(0, 255), 255]))
+        tb.start_scoreboard() # Checks on the fly, the monitor restarts every batch
+        await tb.start_dma()
+        result = await tb.wait_done()
+        await tb.stop_dma()
+        tb.check_scoreboard()
+        assert result.error == 0, f"DMA error on batch {batches}: {[str(d) for d in descs if d.en]}"
+        nbytes = sum(desc.nbytes for desc in descs if desc.en)
+        batches     += 1
+        win_bytes   += nbytes
+        total_bytes += nbytes
+
+        if cycles_since(win_start) >= cfg_const.SOAK_WINDOW_CYCLES:
+            cycles = cycles_since(win_start)
+            windows.append({'cycle': cycles_since(sim_start), 'cycles': cycles,
+                            'bytes': win_bytes, 'bytes_per_cycle': win_bytes/cycles})
+            tb.log.info("[Soak] cycle %d batch %d: %.3f B/cycle over the last %d cycles (%.0f cycles/s)",
+                        cycles_since(sim_start), batches, win_bytes/cycles, cycles,
+                        cycles_since(sim_start)/(time.monotonic()-wall_start))
+            win_start = get_sim_time(units='ns')
+            win_bytes = 0
+
+    cycles = max(cycles_since(sim_start), 1)
+    rates  = [w['bytes_per_cycle'] for w in windows]
+    summary = {'batches': batches, 'cycles': cycles, 'bytes': total_bytes,
+               'bytes_per_cycle': total_bytes/cycles,
+               'min_window_bytes_per_cycle': min(rates, default=None),
+               'max_window_bytes_per_cycle': max(rates, default=None),
+               'wall_secs': time.monotonic()-wall_start,
+               'windows': windows}
+    tb.log.info("[Soak] %d batches, %dB in %d cycles (%.3f B/cycle), %.1fs wall",
+                batches, total_bytes, cycles, summary['bytes_per_cycle'], summary['wall_secs'])
+    tb.dump_json("soak", summary)
+
+# Soak run, runs on its own through tox -e soak
+REGRESSION = False
+
+if cocotb.SIM_NAME:
+    factory = TestFactory(test_function=run_test)
+    factory.generate_tests()
+
+@pytest.mark.skipif(os.getenv("DMA_SOAK") != "1", reason="Soak run only with DMA_SOAK=1")
+@pytest.mark.parametrize("flavor",cfg_const.regression_setup)
+def test_dma_soak(flavor):
+    """
+    Test ID: 10
+    Description:
+    Keeps the DMA busy with random descriptor batches (sizes, alignments,
+    modes, max bursts) until the cycle or wall-clock budget runs out,
+    checking every burst and logging the sustained throughput.
+    """
+    module = os.path.splitext(os.path.basename(__file__))[0]
+    run_sim(module, flavor)